@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, request, jsonify
 from backend.middleware.auth import token_required
 from backend.models.user_config import UserConfig
@@ -28,6 +29,129 @@ def feedback(current_user):
     return jsonify({"message": "Feedback received"}), 200
 
 
+# Upper bound on messages accepted by /batch in one request
+MAX_BATCH_MESSAGES = 20
+BATCH_WORKERS = 4
+
+
+def _load_chat_context(current_user):
+    """
+    Resolve the user's RAG context and verify chat is available.
+    Returns (user_context, None) when ready, or (None, (response, status)).
+    """
+    user_config = UserConfig.get_user(current_user["uid"]) or {}
+    user_context = build_user_context(
+        current_user["uid"],
+        email=current_user.get("email"),
+        user_config=user_config,
+    )
+    openai_key = user_context.get("openai_api_key")
+    if not openai_key:
+        return None, (jsonify({"message": "OpenAI API key is not configured."}), 400)
+    if not user_config.get("openai_key_valid"):
+        return None, (
+            jsonify(
+                {
+                    "message": "OpenAI API key is not validated. Please test it in Settings.",
+                    "needs_config": True,
+                }
+            ),
+            400,
+        )
+
+    drive_file_ids = user_context.get("drive_file_ids") or []
+    google_token = user_context.get("google_token")
+    if not google_token:
+        return None, (
+            jsonify(
+                {
+                    "message": "Google Drive access is not authorized. Please connect your Drive in Settings.",
+                    "needs_config": True,
+                }
+            ),
+            400,
+        )
+    if not drive_file_ids:
+        return None, (
+            jsonify(
+                {
+                    "message": "Google Drive files are not selected. Please choose files in Settings.",
+                    "needs_config": True,
+                }
+            ),
+            400,
+        )
+
+    # Check indexing status before allowing queries
+    indexing_status = IndexingService.get_status(current_user["uid"])
+    status = indexing_status.get("status")
+
+    # Only block if we are indexing AND we don't have a previous successful connection.
+    # This allows silent background syncs (from the scheduler) to happen without interrupting the chat.
+    indexing_completed_at = user_config.get("indexing_completed_at")
+    if status == IndexingStatus.PROCESSING and not indexing_completed_at:
+        progress = indexing_status.get("progress", 0)
+        message = indexing_status.get("message", "Processing documents...")
+        return None, (
+            jsonify(
+                {
+                    "message": f"We're still getting your documents ready ({progress}% complete). {message}",
+                    "indexing": True,
+                    "progress": progress,
+                }
+            ),
+            202,
+        )
+
+    if status == IndexingStatus.PENDING:
+        return None, (
+            jsonify(
+                {
+                    "message": "We haven't built your document database yet. Please go to Settings and click 'Build Database' to begin.",
+                    "indexing": False,
+                    "needs_config": True,
+                }
+            ),
+            400,
+        )
+
+    if status == IndexingStatus.FAILED:
+        error_message = indexing_status.get("message", "Unknown error")
+        return None, (
+            jsonify(
+                {
+                    "message": f"We ran into an issue getting your documents ready: {error_message}. Please check your connection in Settings.",
+                    "indexing": False,
+                    "failed": True,
+                }
+            ),
+            400,
+        )
+
+    return user_context, None
+
+
+def _answer(user_message, user_context):
+    """Run one message through RAG and the output safety check."""
+    # Pass user context/ACL here in future
+    query_bundle = QueryBundle(
+        query_str=user_message,
+        custom_embedding_strs=[user_message],
+    )
+    response_text = RAGService.query(query_bundle, user_context)
+
+    # Safety Check Output
+    is_safe_response, reason_response = SafetyService.is_safe(response_text)
+    if not is_safe_response:
+        response_text = "[REDACTED due to safety policy]"
+
+    return {
+        "response": response_text,
+        "citations": [],  # Placeholder for future citations
+        "message_id": "mock-id-123",  # Placeholder
+    }
+
+
 @chat_bp.route("/message", methods=["POST"])
 @token_required
 def chat(current_user):
@@ -43,117 +167,59 @@ def chat(current_user):
         return jsonify({"message": f"Safety Violation: {reason}"}), 400
 
     try:
-        user_config = UserConfig.get_user(current_user["uid"]) or {}
-        user_context = build_user_context(
-            current_user["uid"],
-            email=current_user.get("email"),
-            user_config=user_config,
-        )
-        openai_key = user_context.get("openai_api_key")
-        if not openai_key:
-            return jsonify({"message": "OpenAI API key is not configured."}), 400
-        if not user_config.get("openai_key_valid"):
-            return (
-                jsonify(
-                    {
-                        "message": "OpenAI API key is not validated. Please test it in Settings.",
-                        "needs_config": True,
-                    }
-                ),
-                400,
-            )
-
-        drive_file_ids = user_context.get("drive_file_ids") or []
-        google_token = user_context.get("google_token")
-        if not google_token:
-            return (
-                jsonify(
-                    {
-                        "message": "Google Drive access is not authorized. Please connect your Drive in Settings.",
-                        "needs_config": True,
-                    }
-                ),
-                400,
-            )
-        if not drive_file_ids:
-            return (
-                jsonify(
-                    {
-                        "message": "Google Drive files are not selected. Please choose files in Settings.",
-                        "needs_config": True,
-                    }
-                ),
-                400,
-            )
-
-        # Check indexing status before allowing queries
-        indexing_status = IndexingService.get_status(current_user["uid"])
-        status = indexing_status.get("status")
-
-        # Only block if we are indexing AND we don't have a previous successful connection.
-        # This allows silent background syncs (from the scheduler) to happen without interrupting the chat.
-        indexing_completed_at = user_config.get("indexing_completed_at")
-        if status == IndexingStatus.PROCESSING and not indexing_completed_at:
-            progress = indexing_status.get("progress", 0)
-            message = indexing_status.get("message", "Processing documents...")
-            return (
-                jsonify(
-                    {
-                        "message": f"We're still getting your documents ready ({progress}% complete). {message}",
-                        "indexing": True,
-                        "progress": progress,
-                    }
-                ),
-                202,
-            )
-
-        if status == IndexingStatus.PENDING:
-            return (
-                jsonify(
-                    {
-                        "message": "We haven't built your document database yet. Please go to Settings and click 'Build Database' to begin.",
-                        "indexing": False,
-                        "needs_config": True,
-                    }
-                ),
-                400,
-            )
-
-        if status == IndexingStatus.FAILED:
-            error_message = indexing_status.get("message", "Unknown error")
-            return (
-                jsonify(
-                    {
-                        "message": f"We ran into an issue getting your documents ready: {error_message}. Please check your connection in Settings.",
-                        "indexing": False,
-                        "failed": True,
-                    }
-                ),
-                400,
-            )
-
-        # Pass user context/ACL here in future
-        query_bundle = QueryBundle(
-            query_str=user_message,
-            custom_embedding_strs=[user_message],
-        )
-        response_text = RAGService.query(query_bundle, user_context)
+        user_context, error = _load_chat_context(current_user)
+        if error:
+            return error
+        return jsonify(_answer(user_message, user_context)), 200
+    except Exception as e:
+        logger.exception(f"Chat Error: {e}")
+        return jsonify({"message": "Error processing request", "error": str(e)}), 500
 
-        # Safety Check Output
-        is_safe_response, reason_response = SafetyService.is_safe(response_text)
-        if not is_safe_response:
-            response_text = "[REDACTED due to safety policy]"
 
+@chat_bp.route("/batch", methods=["POST"])
+@token_required
+def chat_batch(current_user):
+    """
+    Answer several messages in one request. The user's config and indexing
+    status are checked once; each entry in "responses" carries its own
+    "status" and the same fields /message would return.
+    """
+    data = request.get_json()
+    messages = (data or {}).get("messages")
+    if not isinstance(messages, list) or not messages:
+        return jsonify({"message": "Messages are required"}), 400
+    if len(messages) > MAX_BATCH_MESSAGES:
         return (
-            jsonify(
-                {
-                    "response": response_text,
-                    "citations": [],  # Placeholder for future citations
-                    "message_id": "mock-id-123",  # Placeholder
-                }
-            ),
-            200,
+            jsonify({"message": f"At most {MAX_BATCH_MESSAGES} messages per batch"}),
+            400,
         )
+
+    def answer_one(user_message):
+        if not isinstance(user_message, str) or not user_message:
+            return {"status": 400, "message": "Message is required"}
+        is_safe, reason = SafetyService.is_safe(user_message)
+        if not is_safe:
+            return {"status": 400, "message": f"Safety Violation: {reason}"}
+        try:
+            return {"status": 200, **_answer(user_message, user_context)}
+        except Exception as e:
+            logger.exception(f"Chat Error: {e}")
+            return {
+                "status": 500,
+                "message": "Error processing request",
+                "error": str(e),
+            }
+
+    try:
+        user_context, error = _load_chat_context(current_user)
+        if error:
+            return error
+        # Workers for the same user may all miss a cold index at once; the
+        # lazy engine rebuilds it through RAGService.get_or_build_index, so
+        # only one of them builds and the rest wait for that index
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+            responses = list(executor.map(answer_one, messages))
+        return jsonify({"responses": responses}), 200
     except Exception as e:
         logger.exception(f"Chat Error: {e}")
         return jsonify({"message": "Error processing request", "error": str(e)}), 500
@@ -1,4 +1,6 @@
 import os
+import threading
+import time
 
 import firebase_admin
 from firebase_admin import auth, credentials, firestore
@@ -9,6 +11,11 @@ _db = None
 _cred = None
 _project_id = None
 
+# Decoded claims keyed by raw token, kept until the token's own expiry
+_VERIFIED_TOKEN_CACHE_MAX = 256
+_verified_tokens = {}
+_verified_tokens_lock = threading.Lock()
+
 
 def _load_credentials():
     cred_path = os.getenv("FIREBASE_ADMIN_CREDENTIALS_PATH")
@@ -77,6 +84,28 @@ def get_firestore_client():
     return _db
 
 
+def _token_cache_enabled():
+    return os.getenv("ALLOW_CACHED_TOKEN_FOR_TESTS", "false").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+
+
 def verify_firebase_token(id_token):
+    use_cache = _token_cache_enabled()
+    if use_cache:
+        with _verified_tokens_lock:
+            cached = _verified_tokens.get(id_token)
+        if cached is not None and cached[0] > time.time():
+            return cached[1]
+
     initialize_firebase()
-    return auth.verify_id_token(id_token)
+    decoded = auth.verify_id_token(id_token)
+
+    if use_cache and decoded.get("exp"):
+        with _verified_tokens_lock:
+            if len(_verified_tokens) >= _VERIFIED_TOKEN_CACHE_MAX:
+                _verified_tokens.clear()
+            _verified_tokens[id_token] = (decoded["exp"], decoded)
+    return decoded
@@ -1,6 +1,7 @@
 import re
 import logging
 import json
+from functools import lru_cache
 from typing import List, Tuple, Any
 
 from llama_index.core.base.base_query_engine import BaseQueryEngine
@@ -21,6 +22,27 @@ from .structured_output import parse_structured_output, repair_llm_json, get_saf
 logger = logging.getLogger(__name__)
 
 
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@lru_cache(maxsize=8)
+def _schema_instructions(schema_prompt: str) -> str:
+    """Inject the LLMOutput JSON schema into the schema prompt (serialized once)."""
+    schema_json = _escape_braces(
+        json.dumps(LLMOutput.model_json_schema(), indent=2))
+    return schema_prompt.replace("{{SCHEMA}}", schema_json)
+
+
+@lru_cache(maxsize=8)
+def _examples_block(name: str) -> str:
+    """Render few-shot examples for a prompt as a template-safe block."""
+    examples = load_examples(name)
+    if not examples:
+        return ""
+    return "\n\n### Examples:\n" + _escape_braces(json.dumps(examples, indent=2))
+
+
 class CasualQueryEngine(BaseQueryEngine):
     def __init__(self, llm, callback_manager, user_context=None):
         super().__init__(callback_manager)
@@ -41,7 +63,7 @@ class CasualQueryEngine(BaseQueryEngine):
 
         self._system_prompt = system_spec.text
         self._schema_prompt = schema_spec.text
-        self._examples = load_examples("casual")
+        self._examples_str = _examples_block("casual")
 
     @property
     def opik_prompts(self):
@@ -49,15 +71,8 @@ class CasualQueryEngine(BaseQueryEngine):
 
     def _query(self, query_bundle: QueryBundle):
         # Dynamic Schema Injection
-        schema_json = json.dumps(LLMOutput.model_json_schema(), indent=2).replace(
-            "{", "{{").replace("}", "}}")
-        schema_instr = self._schema_prompt.replace("{{SCHEMA}}", schema_json)
-
-        examples_str = ""
-        if self._examples:
-            examples_json = json.dumps(self._examples, indent=2).replace(
-                "{", "{{").replace("}", "}}")
-            examples_str = "\n\n### Examples:\n" + examples_json
+        schema_instr = _schema_instructions(self._schema_prompt)
+        examples_str = self._examples_str
 
         # Apply prompt overrides
         prompt_overrides = self._user_context.get(
@@ -119,7 +134,10 @@ class LazyRAGQueryEngine(BaseQueryEngine):
             from backend.services.indexing_service import IndexingService, IndexingStatus
             status_info = IndexingService.get_status(user_id)
             if status_info.get("status") == IndexingStatus.COMPLETED:
-                index = self._rebuild_index_from_vector_store(user_id)
+                # Concurrent cold queries for this user share one rebuild
+                index = self._service.get_or_build_index(
+                    user_id,
+                    lambda: self._build_index_from_vector_store(user_id))
 
             if not index:
                 llm_output = get_safe_llm_output(
@@ -166,7 +184,7 @@ class LazyRAGQueryEngine(BaseQueryEngine):
         response.metadata["llm_output"] = llm_output
         return response
 
-    def _rebuild_index_from_vector_store(self, user_id: str):
+    def _build_index_from_vector_store(self, user_id: str):
         from llama_index.core import VectorStoreIndex
         try:
             vector_store = self._service.get_vector_store(user_id)
@@ -176,7 +194,6 @@ class LazyRAGQueryEngine(BaseQueryEngine):
                 vector_store=vector_store,
                 callback_manager=self._callback_manager,
             )
-            self._service._index_by_user[user_id] = index
             return index
         except Exception as e:
             logger.error("Failed to rebuild index: %s", e)
@@ -221,7 +238,6 @@ def build_rag_query_engine(query_bundle, llm, callback_manager, index, bm25_node
     # Load prompts
     system_spec = get_prompt_spec("rag_system")
     schema_spec = get_prompt_spec("output_schema")
-    examples = load_examples("rag")
 
     system_text = (prompt_overrides.get("rag_system")
                    if prompt_overrides and "rag_system" in prompt_overrides
@@ -233,15 +249,8 @@ def build_rag_query_engine(query_bundle, llm, callback_manager, index, bm25_node
     ]
 
     # Dynamic Schema Injection
-    schema_json = json.dumps(LLMOutput.model_json_schema(), indent=2).replace(
-        "{", "{{").replace("}", "}}")
-    schema_instr = schema_spec.text.replace("{{SCHEMA}}", schema_json)
-
-    examples_str = ""
-    if examples:
-        examples_json = json.dumps(examples, indent=2).replace(
-            "{", "{{").replace("}", "}}")
-        examples_str = "\n\n### Examples:\n" + examples_json
+    schema_instr = _schema_instructions(schema_spec.text)
+    examples_str = _examples_block("rag")
 
     # We combine them into the text_qa_template
     # This ensures the LLM sees the grounding rules AND the JSON schema rules.
@@ -1,6 +1,7 @@
 import logging
 import os
 import re
+import threading
 from typing import Any, Dict, List, Optional, Union
 
 from llama_index.core import VectorStoreIndex, StorageContext
@@ -28,6 +29,9 @@ from .schemas.system_output import SystemOutput, RetrievalHit
 
 class RAGService:
     _index_by_user = {}
+    # Serializes index builds per user; other users' lookups never wait on it
+    _build_locks = {}
+    _build_locks_guard = threading.Lock()
     _bm25_nodes_by_user = {}
     _document_catalog_by_user = {}
     logger = logging.getLogger(__name__)
@@ -44,6 +48,36 @@ class RAGService:
     def get_index(cls, user_id):
         return cls._index_by_user.get(user_id)
 
+    @classmethod
+    def register_index(cls, user_id, index):
+        """Cache a user's index."""
+        cls._index_by_user[user_id] = index
+
+    @classmethod
+    def _build_lock(cls, user_id):
+        with cls._build_locks_guard:
+            lock = cls._build_locks.get(user_id)
+            if lock is None:
+                lock = cls._build_locks[user_id] = threading.Lock()
+            return lock
+
+    @classmethod
+    def get_or_build_index(cls, user_id, build):
+        """
+        Return the cached index for a user, calling build() at most once
+        when concurrent callers for that user miss at the same time.
+        """
+        index = cls.get_index(user_id)
+        if index is not None:
+            return index
+        with cls._build_lock(user_id):
+            index = cls.get_index(user_id)
+            if index is None:
+                index = build()
+                if index is not None:
+                    cls.register_index(user_id, index)
+            return index
+
     @classmethod
     def get_bm25_nodes(cls, user_id):
         return cls._bm25_nodes_by_user.get(user_id)
@@ -132,9 +166,9 @@ class RAGService:
 
             cls._bm25_nodes_by_user[user_id] = nodes
             notify("Generating embeddings and uploading...", 75)
-            cls._index_by_user[user_id] = VectorStoreIndex(
+            cls.register_index(user_id, VectorStoreIndex(
                 nodes, callback_manager=settings.callback_manager, storage_context=storage_context
-            )
+            ))
             notify("Finalizing...", 95)
             if vector_store:
                 log_vector_store_count(vector_store)
@@ -3,24 +3,49 @@ import json
 import hashlib
 import logging
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Optional, List, Any
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _read_text(path: str) -> str:
+    """Read a small UTF-8 file with a single sized read instead of a text wrapper."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        chunks = []
+        while True:
+            chunk = os.read(fd, max(size, 1))
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    text = b"".join(chunks).decode("utf-8")
+    # Match text-mode universal newline handling.
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+@dataclass(frozen=True, slots=True)
 class PromptSpec:
     name: str
     version: str
     text: str
     hash: str
     path: str
+    # First 8 hex chars of ``hash`` for display
+    hash_short: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "hash_short", self.hash[:8])
 
 
 class PromptLoader:
-    _instance = None
-    _cache: Dict[str, PromptSpec] = {}
 
     # Prompts now at repo root
     PROMPT_DIR = os.path.abspath(os.path.join(
@@ -28,22 +53,15 @@ class PromptLoader:
     VERSION_FILE = os.path.join(PROMPT_DIR, "versions.json")
     EXAMPLES_DIR = os.path.join(PROMPT_DIR, "examples")
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(PromptLoader, cls).__new__(cls)
-        return cls._instance
-
-    def _get_hash(self, text: str) -> str:
-        # Normalize whitespace for deterministic hashing (ignore just reformatting)
-        normalized = re.sub(r"\s+", " ", text).strip()
-        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    def __init__(self, eager: bool = True):
+        self._cache: Dict[str, PromptSpec] = {}
+        self._versions: Dict[str, str] = {}
+        self._load_versions()
+        if eager:
+            self.preload()
 
-    def get(self, name: str) -> PromptSpec:
-        """Load a prompt by name (e.g., 'rag_system')."""
-        if name in self._cache:
-            return self._cache[name]
-
-        # Load versions
+    def _load_versions(self) -> None:
+        """Read versions.json once; missing or invalid files mean 'unknown'."""
         versions = {}
         if os.path.exists(self.VERSION_FILE):
             try:
@@ -51,28 +69,55 @@ class PromptLoader:
                     versions = json.load(f)
             except Exception as e:
                 logger.warning("Failed to load versions.json: %s", e)
+        self._versions = versions
+
+    def preload(self) -> None:
+        """Warm the cache with every versioned prompt so first requests skip disk IO."""
+        for name in self._versions:
+            try:
+                self.get(name)
+            except (OSError, UnicodeDecodeError) as e:
+                # Nothing is cached on failure, so get() raises it again on
+                # first use instead of failing the module import.
+                logger.warning("Skipping preload of prompt %s: %s", name, e)
+
+    def _get_hash(self, text: str) -> str:
+        # Normalize whitespace for deterministic hashing (ignore just reformatting)
+        normalized = _WHITESPACE_RE.sub(" ", text).strip()
+        # Tracking ID only, not a security boundary.
+        return hashlib.sha256(
+            normalized.encode("utf-8"), usedforsecurity=False
+        ).hexdigest()
+
+    def get(self, name: str) -> PromptSpec:
+        """Load a prompt by name (e.g., 'rag_system')."""
+        spec = self._cache.get(name)
+        if spec is not None:
+            return spec
 
         filename = f"{name}.md" if not name.endswith(".md") else name
         file_path = os.path.join(self.PROMPT_DIR, filename)
 
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"Prompt file not found: {file_path}")
-
-        with open(file_path, "r") as f:
-            text = f.read()
+        # Let the open itself detect a missing file rather than stat first
+        try:
+            text = _read_text(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(
+                f"Prompt file not found: {file_path}") from None
 
         # Strip .md for version lookup
         version_key = name[:-3] if name.endswith(".md") else name
         spec = PromptSpec(
             name=name,
-            version=versions.get(version_key, "unknown"),
+            version=self._versions.get(version_key, "unknown"),
             text=text,
             hash=self._get_hash(text),
             path=file_path
         )
 
-        self._cache[name] = spec
-        return spec
+        # setdefault is atomic under the GIL: concurrent cold loads may race,
+        # but every caller ends up sharing the first spec stored.
+        return self._cache.setdefault(name, spec)
 
     def load_examples(self, name: str) -> List[Dict[str, Any]]:
         """Load few-shot examples for a prompt if they exist."""
@@ -90,16 +135,20 @@ class PromptLoader:
             return []
 
 
+# Shared process-wide loader; use this instead of constructing new loaders.
+PROMPT_LOADER = PromptLoader()
+
+
 def load_prompt(name: str) -> str:
     """Convenience function to get prompt text."""
-    return PromptLoader().get(name).text
+    return PROMPT_LOADER.get(name).text
 
 
 def get_prompt_spec(name: str) -> PromptSpec:
     """Convenience function to get full spec."""
-    return PromptLoader().get(name)
+    return PROMPT_LOADER.get(name)
 
 
 def load_examples(name: str) -> List[Dict[str, Any]]:
     """Convenience function to get examples."""
-    return PromptLoader().load_examples(name)
+    return PROMPT_LOADER.load_examples(name)
@@ -3,10 +3,13 @@
 from datetime import datetime, timezone
 from typing import Any, Optional
 
+_NOW = datetime.now
+_UTC = timezone.utc
+
 
 def utc_now() -> datetime:
     """Return a UTC timestamp for persistence."""
-    return datetime.now(timezone.utc)
+    return _NOW(_UTC)
 
 
 def format_dt(value: Optional[Any]) -> Optional[str]:
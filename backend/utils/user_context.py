@@ -4,6 +4,9 @@ from typing import Optional
 
 from backend.models.user_config import UserConfig
 
+# Context fields sourced from the stored user config (besides email).
+_CONFIG_FIELDS = frozenset({"openai_api_key", "drive_file_ids", "google_token"})
+
 
 def build_user_context(
     user_id: str,
@@ -13,7 +16,17 @@ def build_user_context(
     overrides: Optional[dict] = None,
 ) -> dict:
     """Build a standardized user context dict for indexing/query flows."""
-    config = user_config or UserConfig.get_user(user_id) or {}
+    if user_config is not None:
+        config = user_config
+    elif (
+        overrides
+        and _CONFIG_FIELDS <= overrides.keys()
+        and (email or "email" in overrides)
+    ):
+        # Overrides supply every stored field; skip the Firestore read.
+        config = {}
+    else:
+        config = UserConfig.get_user(user_id) or {}
     context = {
         "uid": user_id,
         "email": email or config.get("email"),
@@ -1,7 +1,11 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# Reloaders and test re-imports re-execute this module; parse .env only once
+# per process tree (child processes inherit the already-loaded environment).
+if not os.environ.get("_APP_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_APP_DOTENV_LOADED"] = "1"
 
 
 class Config:
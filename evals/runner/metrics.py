@@ -4,7 +4,10 @@ All metrics are deterministic (no LLM judging).
 """
 
 import re
-from typing import List, Optional, Set
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
 
 from .schema import EvalResult, EvalSample, EvalSummary
 
@@ -22,6 +25,26 @@ REFUSAL_PATTERNS = [
     r"insufficient information",
 ]
 
+# A refusal mentioning more numbers than this is treated as fabricated data
+MAX_REFUSAL_NUMBERS = 5
+
+# Precompiled once at import; refusal patterns are unioned into a single scan.
+_REFUSAL_RE = re.compile(
+    "|".join(f"(?:{p})" for p in REFUSAL_PATTERNS), re.IGNORECASE
+)
+_SOURCES_RE = re.compile(r"(?:###|\*\*)\s*Sources\s*(?::|)", re.IGNORECASE)
+_BULLET_RE = re.compile(r"(?m)^\s*[-*]\s+")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Capitalized words that are not entity names on their own
+_COMMON_WORDS = frozenset({
+    "The", "This", "That", "These", "Those", "What", "Where", "When",
+    "How", "Why", "Which", "Who", "Answer", "Sources", "None", "Limited",
+    "Company", "Corporation", "Ltd", "Inc", "Based", "According",
+})
+_ENTITY_RE = re.compile(
+    r"\b([A-Z][a-zA-Z]{1,}(?:\s+[A-Z][a-zA-Z]+)*)\b"
+)
+
 
 def compute_recall_at_k(
     expected: List[str], retrieved: List[str], k: int
@@ -52,12 +75,34 @@ def compute_recall_all_at_k(
     return hits / len(expected)
 
 
+def compute_recall_metrics(
+    expected: List[str], retrieved: List[str]
+) -> Tuple[float, float, float, float]:
+    """
+    Compute (Recall@5, Recall-All@5, Recall@10, Recall-All@10) sharing the
+    top-k sets, instead of building a fresh set per metric.
+    """
+    if not expected:
+        return 1.0, 1.0, 1.0, 1.0
+    top5 = set(retrieved[:5])
+    top10 = top5.union(retrieved[5:10])
+    hits5 = sum(1 for exp_id in expected if exp_id in top5)
+    hits10 = sum(1 for exp_id in expected if exp_id in top10)
+    n = len(expected)
+    return (
+        1.0 if hits5 else 0.0,
+        hits5 / n,
+        1.0 if hits10 else 0.0,
+        hits10 / n,
+    )
+
+
 def detect_sources_section(answer_text: str) -> bool:
     """Check if the answer contains a Sources section (### Sources or **Sources:**)."""
     if not answer_text:
         return False
     # Support both markdown header and bolded text
-    return bool(re.search(r"(?:###|\*\*)\s*Sources\s*(?::|)", answer_text, re.IGNORECASE))
+    return bool(_SOURCES_RE.search(answer_text))
 
 
 def count_citations(answer_text: str) -> int:
@@ -67,15 +112,16 @@ def count_citations(answer_text: str) -> int:
     """
     if not answer_text:
         return 0
-    match = re.search(
-        r"(?:###|\*\*)\s*Sources\s*(?::|)\s*(.*)", answer_text, re.IGNORECASE | re.DOTALL
-    )
+    match = _SOURCES_RE.search(answer_text)
     if not match:
         return 0
-    sources_text = match.group(1)
-    # Count bullet points (- or *)
-    bullets = re.findall(r"(?m)^\s*[-*]\s+", sources_text)
-    return len(bullets) if bullets else (1 if sources_text.strip() else 0)
+    return _count_bullets(answer_text[match.end():])
+
+
+def _count_bullets(sources_text: str) -> int:
+    """Count bullet points (- or *) without materializing the matches."""
+    bullets = sum(1 for _ in _BULLET_RE.finditer(sources_text))
+    return bullets if bullets else (1 if sources_text.strip() else 0)
 
 
 def check_cites_expected(
@@ -96,11 +142,21 @@ def detect_refusal(answer_text: str) -> bool:
     """Detect if the answer contains refusal language."""
     if not answer_text:
         return False
-    text_lower = answer_text.lower()
-    for pattern in REFUSAL_PATTERNS:
-        if re.search(pattern, text_lower):
-            return True
-    return False
+    return bool(_REFUSAL_RE.search(answer_text))
+
+
+@lru_cache(maxsize=256)
+def scan_answer_text(answer_text: str) -> Tuple[bool, int, bool]:
+    """
+    Run the sources, citation and refusal detectors over an answer once.
+    Returns (has_sources_section, citation_count, refusal_detected). Cached so
+    the per-row Opik metrics scoring the same output share a single scan.
+    """
+    if not answer_text:
+        return False, 0, False
+    match = _SOURCES_RE.search(answer_text)
+    citation_count = _count_bullets(answer_text[match.end():]) if match else 0
+    return bool(match), citation_count, bool(_REFUSAL_RE.search(answer_text))
 
 
 def check_refusal_correctness(
@@ -117,10 +173,11 @@ def check_refusal_correctness(
     if not refusal_detected:
         return False
     # Simple heuristic: check for too many numbers (could be fabricated data)
-    numbers = re.findall(r"\b\d+(?:\.\d+)?\b", answer_text)
-    if len(numbers) > 5:
-        # Too many numbers might indicate fabricated data
-        return False
+    # Stop scanning at the first match past the threshold
+    for count, _ in enumerate(_NUMBER_RE.finditer(answer_text), 1):
+        if count > MAX_REFUSAL_NUMBERS:
+            # Too many numbers might indicate fabricated data
+            return False
     return True
 
 
@@ -130,19 +187,10 @@ def extract_entity_names(text: str) -> Set[str]:
     Simple heuristic for max_entities check.
     """
     # Match capitalized words (at least 2 chars) with optional following words
-    pattern = r"\b([A-Z][a-zA-Z]{1,}(?:\s+[A-Z][a-zA-Z]+)*)\b"
-    matches = re.findall(pattern, text)
-    # Filter out common words that might be capitalized
-    common_words = {
-        "The", "This", "That", "These", "Those", "What", "Where", "When",
-        "How", "Why", "Which", "Who", "Answer", "Sources", "None", "Limited",
-        "Company", "Corporation", "Ltd", "Inc", "Based", "According",
-    }
-    entities = set()
-    for match in matches:
-        words = match.split()
-        if len(words) >= 2 or (len(words) == 1 and words[0] not in common_words):
-            entities.add(match)
+    matches = _ENTITY_RE.findall(text)
+    # Multi-word matches are never in the single-word stoplist, so a single
+    # membership test filters only lone common words.
+    entities = {match for match in matches if match not in _COMMON_WORDS}
     return entities
 
 
@@ -175,22 +223,19 @@ def compute_metrics(
         return result
 
     # Retrieval metrics
-    result.recall_at_5 = compute_recall_at_k(
-        sample.expected_file_ids, result.retrieved_file_ids, 5
-    )
-    result.recall_at_10 = compute_recall_at_k(
-        sample.expected_file_ids, result.retrieved_file_ids, 10
-    )
-    result.recall_all_at_5 = compute_recall_all_at_k(
-        sample.expected_file_ids, result.retrieved_file_ids, 5
-    )
-    result.recall_all_at_10 = compute_recall_all_at_k(
-        sample.expected_file_ids, result.retrieved_file_ids, 10
-    )
+    (
+        result.recall_at_5,
+        result.recall_all_at_5,
+        result.recall_at_10,
+        result.recall_all_at_10,
+    ) = compute_recall_metrics(sample.expected_file_ids, result.retrieved_file_ids)
+
+    has_sources, citation_count, refusal_detected = scan_answer_text(
+        result.answer_text)
 
     # Citation metrics
-    result.has_sources_section = detect_sources_section(result.answer_text)
-    result.citation_count = count_citations(result.answer_text)
+    result.has_sources_section = has_sources
+    result.citation_count = citation_count
     result.citation_count_ok = result.citation_count >= sample.required_citations_count
     result.cites_expected = check_cites_expected(
         sample.expected_file_ids,
@@ -199,7 +244,7 @@ def compute_metrics(
     )
 
     # Refusal metrics
-    result.refusal_detected = detect_refusal(result.answer_text)
+    result.refusal_detected = refusal_detected
     result.refusal_correct = check_refusal_correctness(
         sample.must_refuse, result.refusal_detected, result.answer_text
     )
@@ -212,62 +257,81 @@ def compute_metrics(
     return result
 
 
+_NO_FLAGS = (False, False)
+
+
+def compute_metrics_batch(
+    samples: List[EvalSample],
+    results: List[EvalResult],
+    allowed_entities: Optional[Set[str]] = None,
+) -> List[EvalResult]:
+    """
+    Compute metrics for aligned samples/results in-process.
+    Scores each result in place and returns the same objects in input order.
+    """
+    return [
+        compute_metrics(sample, result, allowed_entities)
+        for sample, result in zip(samples, results)
+    ]
+
+
 def compute_summary(
     results: List[EvalResult], samples: List[EvalSample]
 ) -> EvalSummary:
     """
-    Compute summary statistics for an evaluation run.
+    Compute summary statistics for an evaluation run in a single pass.
     """
+    # (must_cite, must_refuse) per sample id
+    sample_flags = {s.id: (s.must_cite, s.must_refuse) for s in samples}
+    nan = float("nan")
+
+    # Column layout: latency, recall@5, recall@10, recall-all@5,
+    # recall-all@10, cite compliance, refusal correctness. The last two are
+    # NaN for samples that don't require a citation / refusal.
+    rows = []
+    for r in results:
+        if r.error is not None:
+            continue
+        must_cite, must_refuse = sample_flags.get(r.sample_id, _NO_FLAGS)
+        rows.append((
+            r.latency_ms,
+            r.recall_at_5,
+            r.recall_at_10,
+            r.recall_all_at_5,
+            r.recall_all_at_10,
+            float(r.has_sources_section and r.cites_expected)
+            if must_cite else nan,
+            float(r.refusal_correct is True) if must_refuse else nan,
+        ))
+
     summary = EvalSummary()
     summary.total_samples = len(results)
-    summary.successful_samples = sum(1 for r in results if r.error is None)
-    summary.failed_samples = summary.total_samples - summary.successful_samples
-
-    successful_results = [r for r in results if r.error is None]
-
-    if successful_results:
-        summary.mean_latency_ms = sum(r.latency_ms for r in successful_results) / len(
-            successful_results
-        )
-        summary.mean_recall_at_5 = sum(r.recall_at_5 for r in successful_results) / len(
-            successful_results
-        )
-        summary.mean_recall_at_10 = sum(
-            r.recall_at_10 for r in successful_results
-        ) / len(successful_results)
-        summary.mean_recall_all_at_5 = sum(
-            r.recall_all_at_5 for r in successful_results
-        ) / len(successful_results)
-        summary.mean_recall_all_at_10 = sum(
-            r.recall_all_at_10 for r in successful_results
-        ) / len(successful_results)
-
-    # Citation compliance
-    sample_map = {s.id: s for s in samples}
-    cite_samples = [
-        r
-        for r in successful_results
-        if sample_map.get(r.sample_id, EvalSample("", "", "")).must_cite
-    ]
-    summary.cite_samples_count = len(cite_samples)
-    if cite_samples:
-        cite_compliant = sum(
-            1 for r in cite_samples if r.has_sources_section and r.cites_expected
-        )
-        summary.cite_compliance_rate = cite_compliant / len(cite_samples)
-
-    # Refusal correctness
-    refusal_samples = [
-        r
-        for r in successful_results
-        if sample_map.get(r.sample_id, EvalSample("", "", "")).must_refuse
-    ]
-    summary.refusal_samples_count = len(refusal_samples)
-    if refusal_samples:
-        refusal_correct = sum(
-            1 for r in refusal_samples if r.refusal_correct is True
-        )
-        summary.refusal_correctness_rate = refusal_correct / \
-            len(refusal_samples)
+    summary.successful_samples = len(rows)
+    summary.failed_samples = summary.total_samples - len(rows)
+
+    if not rows:
+        return summary
+
+    # One vectorized reduction over all metric columns
+    arr = np.asarray(rows, dtype=np.float64)
+    (
+        summary.mean_latency_ms,
+        summary.mean_recall_at_5,
+        summary.mean_recall_at_10,
+        summary.mean_recall_all_at_5,
+        summary.mean_recall_all_at_10,
+    ) = (float(m) for m in arr[:, :5].mean(axis=0))
+
+    # Citation compliance and refusal correctness over the flagged samples
+    flagged = ~np.isnan(arr[:, 5:])
+    summary.cite_samples_count, summary.refusal_samples_count = (
+        int(n) for n in flagged.sum(axis=0))
+    passed = np.nansum(arr[:, 5:], axis=0)
+    if summary.cite_samples_count:
+        summary.cite_compliance_rate = float(
+            passed[0] / summary.cite_samples_count)
+    if summary.refusal_samples_count:
+        summary.refusal_correctness_rate = float(
+            passed[1] / summary.refusal_samples_count)
 
     return summary
@@ -0,0 +1,23 @@
+"""
+Process-wide Opik client shared by the adapter and the extract/manage CLIs.
+"""
+
+import atexit
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def opik_client():
+    """
+    Create the Opik client once per process so config loading, auth and the
+    SDK's HTTP connection pool are reused. Raises ImportError if opik is
+    not installed.
+    """
+    import opik
+
+    client = opik.Opik()
+    end = getattr(client, "end", None)
+    if callable(end):
+        # Flush pending traces and close the connection pool on exit
+        atexit.register(end)
+    return client
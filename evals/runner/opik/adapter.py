@@ -2,19 +2,20 @@
 Opik adapter for evaluation runs.
 """
 
-from backend.utils.opik_prompts import get_or_register_prompt
-from backend.utils.prompt_loader import get_prompt_spec
+import asyncio
 import logging
 import os
-import subprocess
 import sys
-from datetime import datetime
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Dict, List, Optional
+from ._client import opik_client
+from .dataset_utils import chunked, existing_fingerprints, item_fingerprint
 from .metrics import (
-    RecallAt5Metric,
-    RecallAt10Metric,
-    RecallAllAt5Metric,
-    RecallAllAt10Metric,
+    CompositeRecallMetric,
     HasSourcesMetric,
     CitationComplianceMetric,
     RefusalCorrectMetric,
@@ -31,6 +32,97 @@ logger = logging.getLogger(__name__)
 # Default Opik project for evaluations
 DEFAULT_EVAL_PROJECT = "internal-knowledge-assistant-eval"
 
+# Concurrent evaluation tasks; each task blocks on retrieval + LLM I/O
+DEFAULT_EVAL_CONCURRENCY = 10
+
+# Dataset uploads are sent in chunks so building and uploading overlap
+UPLOAD_CHUNK_SIZE = 200
+UPLOAD_WORKERS = 4
+
+
+@lru_cache(maxsize=1)
+def _opik_enabled() -> bool:
+    """Check once per process whether Opik is configured."""
+    try:
+        from backend.config.test_settings import test_settings
+        api_key = os.getenv("OPIK_API_KEY")
+        return bool(api_key) and test_settings.opik_enabled
+    except ImportError:
+        return bool(os.getenv("OPIK_API_KEY"))
+
+
+def _build_dataset_item(sample: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a local eval sample onto Opik's input/expected_output/metadata shape."""
+    get = sample.get
+    return {
+        "input": {
+            "id": get("id", ""),
+            "query": get("query", ""),
+            "intent": get("intent", ""),
+        },
+        "expected_output": {
+            "expected_file_ids": get("expected_file_ids", []),
+            "must_cite": get("must_cite", False),
+            "required_citations_count": get("required_citations_count", 0),
+            "must_refuse": get("must_refuse", False),
+            "is_out_of_scope": get("is_out_of_scope", False),
+        },
+        "metadata": {
+            "answer_style": get("answer_style", "paragraph"),
+            "max_entities": get("max_entities", 0),
+            "no_external_knowledge": get("no_external_knowledge", True),
+            "allowed_uncertainty": get("allowed_uncertainty", False),
+        },
+    }
+
+
+def _resolve_git_sha(repo_root: str) -> Optional[str]:
+    """Read the HEAD commit SHA from .git without spawning a git process."""
+    git_dir = Path(repo_root) / ".git"
+    if git_dir.is_file():
+        # Worktrees/submodules: ".git" is a file pointing at the real git dir
+        content = git_dir.read_text().strip()
+        if not content.startswith("gitdir:"):
+            return None
+        git_dir = (Path(repo_root) / content[len("gitdir:"):].strip()).resolve()
+
+    head = (git_dir / "HEAD").read_text().strip()
+    if not head.startswith("ref:"):
+        return head  # Detached HEAD
+    ref = head[len("ref:"):].strip()
+
+    # Worktrees keep refs in the common dir
+    common_file = git_dir / "commondir"
+    common_dir = (
+        (git_dir / common_file.read_text().strip()).resolve()
+        if common_file.exists()
+        else git_dir
+    )
+    for base in (git_dir, common_dir):
+        ref_path = base / ref
+        if ref_path.exists():
+            return ref_path.read_text().strip()
+
+    packed_refs = common_dir / "packed-refs"
+    if packed_refs.exists():
+        for line in packed_refs.read_text().splitlines():
+            if line.endswith(" " + ref) and not line.startswith(("#", "^")):
+                return line.split(" ", 1)[0]
+    return None
+
+
+@lru_cache(maxsize=1)
+def _git_short_sha() -> str:
+    """Short commit SHA of the repo, resolved once per process."""
+    # CI/container builds without a .git directory can pass the SHA in
+    sha = os.getenv("GIT_COMMIT")
+    if not sha:
+        try:
+            sha = _resolve_git_sha(REPO_ROOT)
+        except OSError:
+            sha = None
+    return sha[:7] if sha else "unknown"
+
 
 class OpikAdapter:
     """
@@ -49,44 +141,42 @@ class OpikAdapter:
         self.dataset_name = dataset_name
         self._client = None
         self._dataset = None
+        self._run_name: Optional[str] = None
         self._enabled = self._check_enabled()
 
     def _check_enabled(self) -> bool:
         """Check if Opik is configured."""
-        try:
-            from backend.config.test_settings import test_settings
-            api_key = os.getenv("OPIK_API_KEY")
-            return bool(api_key) and test_settings.opik_enabled
-        except ImportError:
-            return bool(os.getenv("OPIK_API_KEY"))
+        return _opik_enabled()
 
     def _get_client(self):
         """Get or create Opik client."""
         if self._client is None and self._enabled:
             try:
-                import opik
-                self._client = opik.Opik()
+                self._client = opik_client()
             except Exception as e:
                 logger.warning("Could not create Opik client: %s", e)
                 self._enabled = False
         return self._client
 
-    def _get_run_name(self) -> str:
-        """Generate run name with timestamp and git commit."""
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    def _get_task_threads(self) -> int:
+        """Number of evaluation tasks Opik runs concurrently."""
         try:
-            commit = (
-                subprocess.check_output(
-                    ["git", "rev-parse", "--short", "HEAD"],
-                    cwd=REPO_ROOT,
-                    stderr=subprocess.DEVNULL,
-                )
-                .decode()
-                .strip()
-            )
-        except Exception:
-            commit = "unknown"
-        return f"eval_{timestamp}_{commit}"
+            return max(1, int(os.getenv(
+                "OPIK_EVAL_CONCURRENCY", DEFAULT_EVAL_CONCURRENCY)))
+        except ValueError:
+            logger.warning("Invalid OPIK_EVAL_CONCURRENCY, using %d",
+                           DEFAULT_EVAL_CONCURRENCY)
+            return DEFAULT_EVAL_CONCURRENCY
+
+    def _get_run_name(self) -> str:
+        """
+        Generate run name with timestamp and git commit.
+        Generated once per adapter so every caller sees the same run ID.
+        """
+        if self._run_name is None:
+            timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+            self._run_name = f"eval_{timestamp}_{_git_short_sha()}"
+        return self._run_name
 
     def _get_or_create_dataset(self):
         """Get or create the Opik dataset."""
@@ -117,31 +207,25 @@ class OpikAdapter:
             return False
 
         try:
-            items = []
-            for sample in samples:
-                items.append({
-                    "input": {
-                        "id": sample.get("id", ""),
-                        "query": sample.get("query", ""),
-                        "intent": sample.get("intent", ""),
-                    },
-                    "expected_output": {
-                        "expected_file_ids": sample.get("expected_file_ids", []),
-                        "must_cite": sample.get("must_cite", False),
-                        "required_citations_count": sample.get("required_citations_count", 0),
-                        "must_refuse": sample.get("must_refuse", False),
-                        "is_out_of_scope": sample.get("is_out_of_scope", False),
-                    },
-                    "metadata": {
-                        "answer_style": sample.get("answer_style", "paragraph"),
-                        "max_entities": sample.get("max_entities", 0),
-                        "no_external_knowledge": sample.get("no_external_knowledge", True),
-                        "allowed_uncertainty": sample.get("allowed_uncertainty", False),
-                    },
-                })
-            dataset.insert(items)
-            logger.info("Uploaded %d items to Opik dataset: %s",
-                        len(items), self.dataset_name)
+            # Skip items whose content is already stored in the dataset
+            existing = existing_fingerprints(dataset)
+            items = (
+                item for item in map(_build_dataset_item, samples)
+                if item_fingerprint(item) not in existing
+            )
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                # Keep at most UPLOAD_WORKERS chunks in flight
+                pending = deque()
+                uploaded = 0
+                for chunk in chunked(items, UPLOAD_CHUNK_SIZE):
+                    if len(pending) >= UPLOAD_WORKERS:
+                        pending.popleft().result()
+                    pending.append(executor.submit(dataset.insert, chunk))
+                    uploaded += len(chunk)
+                for future in pending:
+                    future.result()
+            logger.info("Uploaded %d new items (%d already present) to Opik dataset: %s",
+                        uploaded, len(samples) - uploaded, self.dataset_name)
             return True
         except Exception as e:
             logger.warning("Failed to upload dataset items: %s", e)
@@ -152,16 +236,23 @@ class OpikAdapter:
         rag_adapter: Any,
         samples: List[Dict[str, Any]],
         experiment_name: Optional[str] = None,
+        task_threads: Optional[int] = None,
     ) -> Optional[str]:
-        """Run evaluation using Opik's evaluate() API."""
+        """
+        Run evaluation using Opik's evaluate() API. task_threads overrides
+        OPIK_EVAL_CONCURRENCY for this run.
+        """
         if not self._enabled:
             logger.info("Opik logging disabled, skipping")
             return None
 
         try:
             from opik.evaluation import evaluate
+            from backend.utils.opik_prompts import get_or_register_prompt
+            from backend.utils.prompt_loader import get_prompt_spec
 
-            self.upload_dataset_items(samples)
+            # Opik's SDK is blocking; run it off the event loop
+            await asyncio.to_thread(self.upload_dataset_items, samples)
             dataset = self._get_or_create_dataset()
             if dataset is None:
                 return None
@@ -171,16 +262,14 @@ class OpikAdapter:
             def sync_evaluation_task(dataset_item):
                 query = dataset_item.get("input", {}).get("query", "")
                 sample_id = dataset_item.get("input", {}).get("id", "")
-                response, node_ids, file_ids, latency_ms = rag_adapter.query(
-                    query)
-                llm_data = getattr(response, "metadata", {}
-                                   ).get("llm_output_obj", {})
+                query_result = rag_adapter.query(query)
+                llm_data = query_result.llm
                 return {
-                    "output": llm_data.get("answer_md", str(response)),
+                    "output": query_result.answer_md,
                     "sample_id": sample_id,
-                    "retrieved_file_ids": file_ids,
-                    "retrieved_node_ids": node_ids,
-                    "latency_ms": latency_ms,
+                    "retrieved_file_ids": query_result.file_ids,
+                    "retrieved_node_ids": query_result.node_ids,
+                    "latency_ms": query_result.latency_ms,
                     "structured": {
                         "refused": llm_data.get("refused", False),
                         "refusal_reason": llm_data.get("refusal_reason", "unknown"),
@@ -192,14 +281,13 @@ class OpikAdapter:
             prompt_spec = get_prompt_spec("rag_system")
             opik_prompt = get_or_register_prompt(prompt_spec)
 
-            evaluate(
+            # evaluate() fans tasks out over task_threads worker threads
+            await asyncio.to_thread(
+                evaluate,
                 dataset=dataset,
                 task=sync_evaluation_task,
                 scoring_metrics=[
-                    RecallAt5Metric(),
-                    RecallAt10Metric(),
-                    RecallAllAt5Metric(),
-                    RecallAllAt10Metric(),
+                    CompositeRecallMetric(),
                     HasSourcesMetric(),
                     CitationComplianceMetric(),
                     RefusalCorrectMetric(),
@@ -207,7 +295,7 @@ class OpikAdapter:
                 experiment_name=run_name,
                 project_name=self.project_name,
                 prompt=opik_prompt,
-                task_threads=10
+                task_threads=task_threads or self._get_task_threads(),
             )
 
             logger.info("Opik experiment created: %s", run_name)
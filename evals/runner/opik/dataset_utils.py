@@ -0,0 +1,39 @@
+"""
+Helpers shared by the Opik dataset upload paths (adapter and manage CLI).
+"""
+
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Set
+
+# Fields that define an Opik dataset item's content
+ITEM_FIELDS = ("input", "expected_output", "metadata")
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of at most ``size`` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def item_fingerprint(item: Dict[str, Any]) -> str:
+    """Stable content key for a dataset item, ignoring server-side fields."""
+    return json.dumps(
+        {field: item.get(field) for field in ITEM_FIELDS},
+        sort_keys=True,
+        default=str,
+    )
+
+
+def existing_fingerprints(dataset: Any) -> Set[str]:
+    """Fingerprints of the items already stored in an Opik dataset."""
+    fingerprints = set()
+    for item in dataset.get_items() or []:
+        if not isinstance(item, dict):
+            item = {field: getattr(item, field, None) for field in ITEM_FIELDS}
+        fingerprints.add(item_fingerprint(item))
+    return fingerprints
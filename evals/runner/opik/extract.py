@@ -6,14 +6,17 @@ Usage:
     conda run -n internal-knowledge-assistant python -m evals.runner.opik.extract --experiment-name eval_20260126_081337
 """
 
-from dotenv import load_dotenv
 from typing import Optional
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timezone
 import sys
 import os
 import logging
-import json
 import argparse
+import numpy as np
+
+from .. import json_compat
+from ._client import opik_client
 
 # Add repo root to path
 REPO_ROOT = os.path.abspath(os.path.join(
@@ -21,16 +24,15 @@ REPO_ROOT = os.path.abspath(os.path.join(
 if REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 
-# Load environment variables from .env
-load_dotenv(os.path.join(REPO_ROOT, ".env"))
-
 logger = logging.getLogger(__name__)
 
 
 def get_opik_client():
+    # Load .env only when a client is needed, so --help stays fast
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(REPO_ROOT, ".env"))
     try:
-        import opik
-        return opik.Opik()
+        return opik_client()
     except ImportError:
         logger.error("Opik SDK not installed.")
         sys.exit(1)
@@ -60,18 +62,19 @@ def extract_results(
         return None
 
     print(f"\n🔍 Extracting items from experiment: {experiment.name}")
-    items = experiment.get_items(truncate=False)
 
     results = {
         "experiment_id": experiment.id,
         "experiment_name": experiment.name,
         "project_name": project_name,
-        "extracted_at": datetime.utcnow().isoformat(),
-        "total_items": len(items),
+        "extracted_at": datetime.now(timezone.utc).isoformat(),
+        "total_items": 0,
         "items": []
     }
 
-    for item in items:
+    # Build item dicts and per-metric score lists in a single pass
+    metrics_summary = defaultdict(list)
+    for item in experiment.get_items(truncate=False):
         item_data = {
             "id": getattr(item, 'id', None),
             "input": getattr(item, 'input', {}),
@@ -82,39 +85,40 @@ def extract_results(
         }
         if hasattr(item, 'feedback_scores') and item.feedback_scores:
             for score in item.feedback_scores:
-                item_data["feedback_scores"].append({
+                score_data = {
                     "name": score.get("name") if isinstance(score, dict) else getattr(score, 'name', None),
                     "value": score.get("value") if isinstance(score, dict) else getattr(score, 'value', None),
                     "reason": score.get("reason") if isinstance(score, dict) else getattr(score, 'reason', None),
-                })
+                }
+                item_data["feedback_scores"].append(score_data)
+                if score_data["value"] is not None:
+                    metrics_summary[score_data["name"]].append(
+                        score_data["value"])
         results["items"].append(item_data)
-
-    metrics_summary = {}
-    for item in results["items"]:
-        for score in item["feedback_scores"]:
-            name = score["name"]
-            if name not in metrics_summary:
-                metrics_summary[name] = []
-            if score["value"] is not None:
-                metrics_summary[name].append(score["value"])
+        results["total_items"] += 1
 
     results["summary_metrics"] = {}
     for name, values in metrics_summary.items():
         if values:
+            arr = np.fromiter(values, dtype=np.float64, count=len(values))
+            p50, p95 = np.quantile(arr, [0.5, 0.95])
             results["summary_metrics"][name] = {
-                "mean": sum(values) / len(values),
-                "min": min(values),
-                "max": max(values),
-                "count": len(values)
+                "mean": float(arr.mean()),
+                "min": float(arr.min()),
+                "max": float(arr.max()),
+                "count": int(arr.size),
+                "std": float(arr.std()),
+                "p50": float(p50),
+                "p95": float(p95),
             }
 
-    print(f"\n✅ Extracted {len(items)} items")
+    print(f"\n✅ Extracted {results['total_items']} items")
     for name, stats in results["summary_metrics"].items():
         print(f"  {name}: Mean {stats['mean']:.4f}")
 
     if output_file:
-        with open(output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(output_file, 'wb') as f:
+            f.write(json_compat.dumps(results, indent=True))
         print(f"💾 Saved to: {output_file}")
 
     return results
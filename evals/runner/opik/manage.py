@@ -7,12 +7,15 @@ Usage:
 """
 
 import argparse
-import json
 import logging
 import os
 import sys
 from dotenv import load_dotenv
 
+from .. import json_compat
+from ._client import opik_client
+from .dataset_utils import chunked, existing_fingerprints, item_fingerprint
+
 # Add repo root to path
 REPO_ROOT = os.path.abspath(os.path.join(
     os.path.dirname(__file__), "..", "..", ".."))
@@ -22,11 +25,13 @@ if REPO_ROOT not in sys.path:
 load_dotenv(os.path.join(REPO_ROOT, ".env"))
 logger = logging.getLogger(__name__)
 
+# Items per dataset.insert request
+SYNC_CHUNK_SIZE = 500
+
 
 def get_opik_client():
     try:
-        import opik
-        return opik.Opik()
+        return opik_client()
     except ImportError:
         logger.error("Opik SDK not installed.")
         sys.exit(1)
@@ -52,34 +57,46 @@ def get_info(name):
         logger.error(f"Failed: {e}")
 
 
-def sync_dataset(name, local_file):
-    client = get_opik_client()
-    samples = []
-    with open(local_file, "r") as f:
+def _build_item(s):
+    return {
+        "input": {"id": s.get("id"), "query": s.get("query"), "intent": s.get("intent")},
+        "expected_output": {
+            "expected_file_ids": s.get("expected_file_ids"),
+            "must_cite": s.get("must_cite"),
+            "required_citations_count": s.get("required_citations_count"),
+            "must_refuse": s.get("must_refuse"),
+            "is_out_of_scope": s.get("is_out_of_scope")
+        },
+        "metadata": {
+            "answer_style": s.get("answer_style"),
+            "max_entities": s.get("max_entities")
+        }
+    }
+
+
+def _iter_items(path):
+    """Stream dataset items from a JSONL file, one line at a time."""
+    with open(path, "rb") as f:
         for line in f:
             if line.strip():
-                samples.append(json.loads(line))
+                yield _build_item(json_compat.loads(line))
+
+
+def sync_dataset(name, local_file):
+    client = get_opik_client()
+    items = list(_iter_items(local_file))
 
     ds = client.get_or_create_dataset(name=name)
-    ds.clear()
 
-    items = []
-    for s in samples:
-        items.append({
-            "input": {"id": s.get("id"), "query": s.get("query"), "intent": s.get("intent")},
-            "expected_output": {
-                "expected_file_ids": s.get("expected_file_ids"),
-                "must_cite": s.get("must_cite"),
-                "required_citations_count": s.get("required_citations_count"),
-                "must_refuse": s.get("must_refuse"),
-                "is_out_of_scope": s.get("is_out_of_scope")
-            },
-            "metadata": {
-                "answer_style": s.get("answer_style"),
-                "max_entities": s.get("max_entities")
-            }
-        })
-    ds.insert(items)
+    # Skip the clear + re-upload when the dataset already matches the file
+    local_fingerprints = {item_fingerprint(item) for item in items}
+    if existing_fingerprints(ds) == local_fingerprints:
+        print(f"✅ {name} is already in sync ({len(items)} items).")
+        return
+
+    ds.clear()
+    for chunk in chunked(items, SYNC_CHUNK_SIZE):
+        ds.insert(chunk)
     print(f"✅ Sync complete for {name} ({len(items)} items).")
 
 
@@ -31,10 +31,9 @@ except ImportError:
 from ..metrics import (
     compute_recall_at_k,
     compute_recall_all_at_k,
-    detect_sources_section,
-    count_citations,
-    detect_refusal,
-    check_refusal_correctness
+    compute_recall_metrics,
+    check_refusal_correctness,
+    scan_answer_text,
 )
 
 logger = logging.getLogger(__name__)
@@ -88,13 +87,33 @@ class RecallAllAt10Metric(BaseMetric):
         return ScoreResult(name=self.name, value=value)
 
 
+class CompositeRecallMetric(BaseMetric):
+    """Recall@5/10 and Recall-All@5/10 from one pass over the retrieved IDs."""
+
+    def __init__(self):
+        super().__init__(name="Recall")
+
+    def score(self, output: str, expected_output: Dict[str, Any], **kwargs: Any) -> List[ScoreResult]:
+        expected_ids = expected_output.get("expected_file_ids", [])
+        retrieved_ids = kwargs.get("retrieved_file_ids", [])
+
+        r5, rall5, r10, rall10 = compute_recall_metrics(
+            expected_ids, retrieved_ids)
+        return [
+            ScoreResult(name="Recall@5", value=r5),
+            ScoreResult(name="Recall@10", value=r10),
+            ScoreResult(name="Recall-All@5", value=rall5),
+            ScoreResult(name="Recall-All@10", value=rall10),
+        ]
+
+
 class HasSourcesMetric(BaseMetric):
     def __init__(self):
         super().__init__(name="Has Sources Section")
 
     def score(self, output: str, **kwargs: Any) -> ScoreResult:
         # We always want to check the text for the Sources section
-        has_sources = detect_sources_section(output or "")
+        has_sources, _, _ = scan_answer_text(output or "")
         return ScoreResult(name=self.name, value=1.0 if has_sources else 0.0)
 
 
@@ -107,14 +126,14 @@ class CitationComplianceMetric(BaseMetric):
         expected_count = expected_output.get("required_citations_count", 0)
 
         # Always check the text for the Sources section
-        has_sources = detect_sources_section(text)
+        has_sources, text_citation_count, _ = scan_answer_text(text)
 
         # Use structured data for citation count if available, otherwise check text
         structured = kwargs.get("structured", {})
         if structured.get("is_structured"):
             actual_count = structured.get("citations_count", 0)
         else:
-            actual_count = count_citations(text)
+            actual_count = text_citation_count
 
         score = 0.0
         reasons = []
@@ -150,7 +169,7 @@ class RefusalCorrectMetric(BaseMetric):
         if structured.get("is_structured"):
             refusal_detected = structured.get("refused", False)
         else:
-            refusal_detected = detect_refusal(text)
+            _, _, refusal_detected = scan_answer_text(text)
 
         is_correct = check_refusal_correctness(
             must_refuse, refusal_detected, text)
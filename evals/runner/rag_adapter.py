@@ -3,19 +3,17 @@ RAG adapter for evaluation runs.
 Provides a unified interface to the production RAG system.
 """
 
-from backend.utils.opik_prompts import get_or_register_prompt
-from backend.utils.prompt_loader import get_prompt_spec
-from llama_index.core.schema import QueryBundle
-from llama_index.core.base.response.schema import Response
-from llama_index.core import VectorStoreIndex
-import json
+import asyncio
+import copy
 import logging
 import os
-import subprocess
 import sys
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Sequence
+
+if TYPE_CHECKING:
+    from llama_index.core import VectorStoreIndex
 
 # Add the repo root to the path for backend imports
 REPO_ROOT = os.path.abspath(os.path.join(
@@ -29,6 +27,35 @@ logger = logging.getLogger(__name__)
 # Default Opik project for evaluations
 DEFAULT_EVAL_PROJECT = "internal-knowledge-assistant-eval"
 
+# Per-adapter query cache size (EVAL_QUERY_CACHE=0 disables caching)
+DEFAULT_QUERY_CACHE_SIZE = 512
+
+
+class QueryResult(NamedTuple):
+    """Answer and retrieval IDs for one query, in the shape the metrics consume."""
+
+    answer_md: str
+    node_ids: Sequence[str]
+    file_ids: Sequence[str]
+    latency_ms: float
+    llm: Dict[str, Any]
+
+
+class _UncacheableResult(Exception):
+    """Carries a query result out of the cached call without caching it."""
+
+    def __init__(self, result: QueryResult):
+        super().__init__()
+        self.result = result
+
+
+def _is_fallback(result: QueryResult) -> bool:
+    """
+    True for canned answers RAGService returns instead of raising (index not
+    ready, unparseable LLM output) and for answers with no retrieval hits.
+    """
+    return bool(result.llm.get("refusal_reason")) or not result.node_ids
+
 
 class RAGAdapter:
     """
@@ -46,6 +73,18 @@ class RAGAdapter:
         self._service_context = None
         self._query_engine = None
 
+        try:
+            cache_size = int(os.getenv(
+                "EVAL_QUERY_CACHE", DEFAULT_QUERY_CACHE_SIZE))
+        except ValueError:
+            logger.warning("Invalid EVAL_QUERY_CACHE, using %d",
+                           DEFAULT_QUERY_CACHE_SIZE)
+            cache_size = DEFAULT_QUERY_CACHE_SIZE
+        self._cached_query = (
+            lru_cache(maxsize=cache_size)(self._query_frozen)
+            if cache_size > 0 else None
+        )
+
     def _get_service_context(self):
         """Get LlamaIndex settings/service context."""
         if self._service_context is None:
@@ -62,9 +101,11 @@ class RAGAdapter:
 
         return get_milvus_vector_store(user_id=self.user_id)
 
-    def _rebuild_index(self) -> Optional[VectorStoreIndex]:
+    def _rebuild_index(self) -> Optional["VectorStoreIndex"]:
         """Rebuild index from vector store."""
         try:
+            from llama_index.core import VectorStoreIndex
+
             vector_store = self._get_vector_store()
             if not vector_store:
                 logger.warning(
@@ -87,25 +128,25 @@ class RAGAdapter:
         try:
             from backend.services.rag import RAGService
 
-            index = RAGService.get_index(self.user_id)
-            if index is not None:
-                self._index = index
-                self._bm25_nodes = RAGService.get_bm25_nodes(self.user_id)
-                return True
-
-            # Try to rebuild from vector store
-            index = self._rebuild_index()
-            if index is not None:
-                self._index = index
-                RAGService._index_by_user[self.user_id] = index
-                return True
-            return False
+            # Rebuild from the vector store only if no index is cached yet;
+            # concurrent adapters for the same user share a single rebuild
+            index = RAGService.get_or_build_index(
+                self.user_id, self._rebuild_index)
+            if index is None:
+                return False
+            self._index = index
+            self._bm25_nodes = RAGService.get_bm25_nodes(self.user_id)
+            return True
         except Exception as e:
             logger.warning("Could not use existing services: %s", e)
             return False
 
     def initialize(self) -> bool:
         """Initialize the adapter, prefer Option A, fallback to Option B."""
+        if self._index is not None:
+            # Already resolved; skip the service lookup and any rebuild.
+            return True
+
         if self._try_existing_services():
             logger.info("Using existing RAG services (Option A)")
             return True
@@ -115,7 +156,41 @@ class RAGAdapter:
         self._index = self._rebuild_index()
         return self._index is not None
 
-    def query(self, query_str: str) -> Tuple[Any, List[str], List[str], float]:
+    def query(self, query_str: str) -> QueryResult:
+        """
+        Run a query, serving repeats of the same query string from memory.
+        Cached hits report the latency measured when the query actually ran.
+        """
+        if self._cached_query is None:
+            return self._query_uncached(query_str)
+        try:
+            cached = self._cached_query(query_str)
+        except _UncacheableResult as skipped:
+            return skipped.result
+        # Hand out copies so callers can't mutate the cached entry
+        return cached._replace(
+            node_ids=list(cached.node_ids),
+            file_ids=list(cached.file_ids),
+            llm=copy.deepcopy(cached.llm),
+        )
+
+    async def aquery(self, query_str: str) -> QueryResult:
+        """Run query() in a worker thread so callers can overlap requests."""
+        return await asyncio.to_thread(self.query, query_str)
+
+    def _query_frozen(self, query_str: str) -> QueryResult:
+        """
+        Cacheable form of _query_uncached with immutable ID sequences.
+        Fallback answers are raised instead of returned so lru_cache never
+        stores them and a repeat of the query runs it again.
+        """
+        result = self._query_uncached(query_str)
+        if _is_fallback(result):
+            raise _UncacheableResult(result)
+        return result._replace(
+            node_ids=tuple(result.node_ids), file_ids=tuple(result.file_ids))
+
+    def _query_uncached(self, query_str: str) -> QueryResult:
         """
         Run a query through the production RAGService and return results.
         This ensures evaluation is as realistic as possible by using the
@@ -128,55 +203,27 @@ class RAGAdapter:
             "openai_api_key": self.openai_api_key
         }
 
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         result = RAGService.query(
             query_str, user_context, return_structured=True)
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
         llm = result.get("llm", {})
-        latency_ms = (time.time() - start_time) * 1000
-
-        from llama_index.core.base.response.schema import Response
-        from llama_index.core.schema import NodeWithScore, TextNode
 
-        source_nodes = []
         hits = result.get("retrieval", {}).get("hits", [])
-        for hit in hits:
-            source_nodes.append(NodeWithScore(
-                node=TextNode(id_=hit["node_id"], text=hit.get(
-                    "text", ""), metadata={"file_id": hit["file_id"]}),
-                score=hit.get("score")
-            ))
-
-        response = Response(
-            response=llm.get("answer_md", ""),
-            source_nodes=source_nodes,
-            metadata={"llm_output_obj": llm}
-        )
 
-        # Extract node IDs and file IDs from source nodes
-        node_ids = []
-        file_ids = []
-        seen_file_ids = set()
-
-        source_nodes = getattr(response, "source_nodes", [])
-        if source_nodes:
-            for node_with_score in source_nodes:
-                node = getattr(node_with_score, "node", None)
-                if node:
-                    node_id = getattr(node, "node_id", None) or getattr(
-                        node, "id_", None)
-                    if node_id:
-                        node_ids.append(node_id)
-
-                    metadata = getattr(node, "metadata", {}) or {}
-                    file_id = metadata.get(
-                        "file_id") or metadata.get("file id")
-                    if file_id and file_id not in seen_file_ids:
-                        file_ids.append(file_id)
-                        seen_file_ids.add(file_id)
-
-        # For metric functions that expect a string, ensure response is string-ifiable
-        # or has a .response attribute
-        return response, node_ids, file_ids, latency_ms
+        # Extract node IDs and file IDs straight from the retrieval hits
+        node_ids = [hit["node_id"] for hit in hits if hit.get("node_id")]
+        # dict.fromkeys dedupes in C while preserving retrieval order
+        file_ids = list(dict.fromkeys(
+            hit["file_id"] for hit in hits if hit.get("file_id")))
+
+        return QueryResult(
+            answer_md=llm.get("answer_md", ""),
+            node_ids=node_ids,
+            file_ids=file_ids,
+            latency_ms=latency_ms,
+            llm=llm,
+        )
 
 
 # Note: OpikAdapter has been moved to .opik.adapter
@@ -13,19 +13,24 @@ Usage:
         --opik-dataset stock_eval_v1
 """
 
+from evals.runner import json_compat
 from evals.runner.schema import EvalResult, EvalSample, EvalSummary
-from evals.runner.metrics import compute_metrics, compute_summary
+from evals.runner.metrics import compute_metrics_batch, compute_summary
 from evals.runner.rag_adapter import RAGAdapter
 from evals.runner.opik.adapter import OpikAdapter
 from dotenv import load_dotenv
 import argparse
+import asyncio
 import json
 import logging
 import os
+import re
 import sys
-from datetime import datetime
+import time
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import FrozenSet, Iterator, List, Optional, Tuple
 
 # Add repo root to path
 REPO_ROOT = Path(__file__).resolve().parent.parent.parent
@@ -44,19 +49,52 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def load_dataset(path: str) -> List[EvalSample]:
-    """Load evaluation dataset from JSONL file."""
-    samples = []
-    with open(path, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                samples.append(EvalSample.from_dict(data))
-            except json.JSONDecodeError as e:
-                logger.warning("Failed to parse line: %s", e)
+DATASET_READ_CHUNK = 1 << 20
+# Buffered results are written out once they reach this size
+RESULTS_FLUSH_BYTES = 4 * 1024 * 1024
+_DOC_EXT_RE = re.compile(r"\.(?:docx|pdf)$", re.I)
+# Sidecar cache of entity names derived from file_id_mapping.json
+ENTITY_CACHE_FILENAME = ".allowed_entities.cache.json"
+
+
+def _iter_jsonl_records(path: str) -> Iterator[bytes]:
+    """
+    Yield the non-blank lines of a JSONL file as bytes, reading it in 1 MiB
+    chunks and splitting on newlines with bytes.find.
+    """
+    with open(path, "rb") as f:
+        tail = b""
+        while True:
+            chunk = f.read(DATASET_READ_CHUNK)
+            if not chunk:
+                break
+            if tail:
+                chunk = tail + chunk
+            start = 0
+            while True:
+                idx = chunk.find(b"\n", start)
+                if idx < 0:
+                    break
+                if idx != start and not chunk[start:idx].isspace():
+                    yield chunk[start:idx]
+                start = idx + 1
+            tail = chunk[start:]
+        if tail and not tail.isspace():
+            yield tail
+
+
+def iter_dataset(path: str) -> Iterator[EvalSample]:
+    """Lazily yield evaluation samples from a JSONL file."""
+    for record in _iter_jsonl_records(path):
+        try:
+            yield EvalSample.from_dict(json_compat.loads(record))
+        except json.JSONDecodeError as e:
+            logger.warning("Failed to parse line: %s", e)
+
+
+def load_dataset(path: str, limit: Optional[int] = None) -> List[EvalSample]:
+    """Load evaluation dataset from JSONL file, stopping after `limit` samples."""
+    samples = list(islice(iter_dataset(path), limit))
     logger.info("Loaded %d samples from %s", len(samples), path)
     return samples
 
@@ -66,50 +104,84 @@ def load_file_id_mapping(dataset_dir: str) -> dict:
     mapping_path = Path(dataset_dir) / "file_id_mapping.json"
     if not mapping_path.exists():
         return {}
-    with open(mapping_path, "r") as f:
-        return json.load(f)
+    return json_compat.loads(mapping_path.read_bytes())
 
 
-def extract_entity_names_from_mapping(mapping: dict) -> Set[str]:
+def extract_entity_names_from_mapping(mapping: dict) -> FrozenSet[str]:
     """Extract entity names from file ID mapping for entity validation."""
+    return _entity_names(tuple(sorted(mapping.values())))
+
+
+@lru_cache(maxsize=8)
+def _entity_names(filenames: Tuple[str, ...]) -> FrozenSet[str]:
     entities = set()
-    for filename in mapping.values():
-        # Remove .docx extension and get company name
-        name = filename.replace(".docx", "").replace(".pdf", "").strip()
+    for filename in filenames:
+        # Remove the document extension to get the company name
+        name = _DOC_EXT_RE.sub("", filename).strip()
         entities.add(name)
-        # Also add parts of the name
-        parts = name.split()
+        # Also add the first word of multi-word names
+        parts = name.split(maxsplit=1)
         if len(parts) > 1:
             entities.add(parts[0])
+    return frozenset(entities)
+
+
+def load_allowed_entities(dataset_dir: str) -> FrozenSet[str]:
+    """
+    Entity names derived from the dataset's file ID mapping. The result is
+    cached in a sidecar file keyed by the mapping's mtime, so warm runs skip
+    re-deriving it.
+    """
+    mapping_path = Path(dataset_dir) / "file_id_mapping.json"
+    if not mapping_path.exists():
+        return frozenset()
+    cache_path = mapping_path.with_name(ENTITY_CACHE_FILENAME)
+    mtime_ns = mapping_path.stat().st_mtime_ns
+
+    try:
+        cached = json_compat.loads(cache_path.read_bytes())
+        if cached["mtime_ns"] == mtime_ns:
+            return frozenset(cached["entities"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    entities = extract_entity_names_from_mapping(
+        load_file_id_mapping(dataset_dir))
+    try:
+        cache_path.write_bytes(json_compat.dumps(
+            {"mtime_ns": mtime_ns, "entities": sorted(entities)}))
+    except OSError as e:
+        logger.debug("Could not write entity cache %s: %s", cache_path, e)
     return entities
 
 
-def run_single_query(
-    adapter: RAGAdapter,
-    sample: EvalSample,
-) -> EvalResult:
-    """Run a single query and capture results."""
-    result = EvalResult(
+def _new_result(sample: EvalSample) -> EvalResult:
+    return EvalResult(
         sample_id=sample.id,
         query=sample.query,
         intent=sample.intent,
         expected_file_ids=sample.expected_file_ids,
     )
 
-    try:
-        response, node_ids, file_ids, latency_ms = adapter.query(sample.query)
 
-        # Extract answer text
-        if hasattr(response, "response"):
-            result.answer_text = response.response or ""
-        else:
-            result.answer_text = str(response)
+def _apply_query_result(result: EvalResult, query_result) -> None:
+    result.answer_text = query_result.answer_md
+    result.retrieved_node_ids = query_result.node_ids
+    result.retrieved_file_ids = query_result.file_ids
+    # Use retrieved as citation proxy
+    result.citation_file_ids = query_result.file_ids
+    result.latency_ms = query_result.latency_ms
 
-        result.retrieved_node_ids = node_ids
-        result.retrieved_file_ids = file_ids
-        result.citation_file_ids = file_ids  # Use retrieved as citation proxy
-        result.latency_ms = latency_ms
 
+def run_single_query(
+    adapter: RAGAdapter,
+    sample: EvalSample,
+) -> EvalResult:
+    """Run a single query and capture results."""
+    result = _new_result(sample)
+
+    try:
+        _apply_query_result(result, adapter.query(sample.query))
     except Exception as e:
         logger.error("Query failed for %s: %s", sample.id, e)
         result.error = str(e)
@@ -117,31 +189,78 @@ def run_single_query(
     return result
 
 
+async def run_single_query_async(
+    adapter: RAGAdapter,
+    sample: EvalSample,
+    semaphore: asyncio.Semaphore,
+) -> EvalResult:
+    """Async variant of run_single_query; the semaphore caps in-flight queries."""
+    result = _new_result(sample)
+
+    async with semaphore:
+        try:
+            _apply_query_result(result, await adapter.aquery(sample.query))
+        except Exception as e:
+            logger.error("Query failed for %s: %s", sample.id, e)
+            result.error = str(e)
+
+    return result
+
+
+def _log_result(idx: int, total: int, result: EvalResult) -> None:
+    logger.info("[%d/%d] Ran: %s", idx, total, result.sample_id)
+    if result.error:
+        logger.warning("  Error: %s", result.error)
+    else:
+        logger.info("  Latency=%.0fms", result.latency_ms)
+
+
+async def run_queries_concurrently(
+    adapter: RAGAdapter,
+    samples: List[EvalSample],
+    concurrency: int,
+) -> List[EvalResult]:
+    """Run all samples with up to `concurrency` queries in flight, in input order."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    results = await asyncio.gather(*[
+        run_single_query_async(adapter, sample, semaphore)
+        for sample in samples
+    ])
+    for idx, result in enumerate(results, 1):
+        _log_result(idx, len(results), result)
+    return list(results)
+
+
 def print_summary(summary: EvalSummary):
-    """Print summary statistics to stdout."""
-    print("\n" + "=" * 60)
-    print("EVALUATION SUMMARY")
-    print("=" * 60)
-    print(f"Total samples:       {summary.total_samples}")
-    print(f"Successful:          {summary.successful_samples}")
-    print(f"Failed:              {summary.failed_samples}")
-    print("-" * 60)
-    print(f"Mean Latency:        {summary.mean_latency_ms:.1f} ms")
-    print("-" * 60)
-    print("RETRIEVAL METRICS")
-    print(f"  Recall@5:          {summary.mean_recall_at_5:.2%}")
-    print(f"  Recall@10:         {summary.mean_recall_at_10:.2%}")
-    print(f"  Recall-All@5:      {summary.mean_recall_all_at_5:.2%}")
-    print(f"  Recall-All@10:     {summary.mean_recall_all_at_10:.2%}")
-    print("-" * 60)
-    print("CITATION COMPLIANCE")
-    print(f"  Samples requiring citations: {summary.cite_samples_count}")
-    print(f"  Compliance rate:   {summary.cite_compliance_rate:.2%}")
-    print("-" * 60)
-    print("REFUSAL CORRECTNESS")
-    print(f"  Samples requiring refusal: {summary.refusal_samples_count}")
-    print(f"  Correctness rate:  {summary.refusal_correctness_rate:.2%}")
-    print("=" * 60)
+    """Print summary statistics to stdout in a single write."""
+    lines = [
+        "",
+        "=" * 60,
+        "EVALUATION SUMMARY",
+        "=" * 60,
+        f"Total samples:       {summary.total_samples}",
+        f"Successful:          {summary.successful_samples}",
+        f"Failed:              {summary.failed_samples}",
+        "-" * 60,
+        f"Mean Latency:        {summary.mean_latency_ms:.1f} ms",
+        "-" * 60,
+        "RETRIEVAL METRICS",
+        f"  Recall@5:          {summary.mean_recall_at_5:.2%}",
+        f"  Recall@10:         {summary.mean_recall_at_10:.2%}",
+        f"  Recall-All@5:      {summary.mean_recall_all_at_5:.2%}",
+        f"  Recall-All@10:     {summary.mean_recall_all_at_10:.2%}",
+        "-" * 60,
+        "CITATION COMPLIANCE",
+        f"  Samples requiring citations: {summary.cite_samples_count}",
+        f"  Compliance rate:   {summary.cite_compliance_rate:.2%}",
+        "-" * 60,
+        "REFUSAL CORRECTNESS",
+        f"  Samples requiring refusal: {summary.refusal_samples_count}",
+        f"  Correctness rate:  {summary.refusal_correctness_rate:.2%}",
+        "=" * 60,
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 def save_results(
@@ -155,15 +274,21 @@ def save_results(
 
     # Save detailed results
     results_path = output_dir / f"{timestamp}_results.jsonl"
-    with open(results_path, "w") as f:
+    with open(results_path, "wb") as f:
+        buf = bytearray()
         for result in results:
-            f.write(json.dumps(result.to_dict()) + "\n")
+            buf += json_compat.dumps(result.to_dict())
+            buf += b"\n"
+            if len(buf) >= RESULTS_FLUSH_BYTES:
+                f.write(buf)
+                buf.clear()
+        f.write(buf)
     logger.info("Saved results to %s", results_path)
 
     # Save summary
     summary_path = output_dir / f"{timestamp}_summary.json"
-    with open(summary_path, "w") as f:
-        json.dump(summary.to_dict(), f, indent=2)
+    with open(summary_path, "wb") as f:
+        f.write(json_compat.dumps(summary.to_dict(), indent=True))
     logger.info("Saved summary to %s", summary_path)
 
 
@@ -211,6 +336,23 @@ async def main():
         default=None,
         help="Limit number of samples to run (for testing)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Max queries in flight during manual evaluation (default: 8)",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Run manual evaluation queries one at a time",
+    )
+    parser.add_argument(
+        "--eval-concurrency",
+        type=int,
+        default=None,
+        help="Concurrent tasks in Opik experiments (default: OPIK_EVAL_CONCURRENCY)",
+    )
     parser.add_argument(
         "--use-opik-experiment",
         action="store_true",
@@ -227,19 +369,18 @@ async def main():
         sys.exit(1)
 
     # Load dataset
-    samples = load_dataset(str(dataset_path))
+    # With --limit, parsing stops once enough samples are read
+    samples = load_dataset(str(dataset_path), args.limit or None)
     if not samples:
         logger.error("No samples loaded from dataset")
         sys.exit(1)
 
     if args.limit:
-        samples = samples[: args.limit]
         logger.info("Limited to %d samples", len(samples))
 
     # Load file ID mapping for entity validation
     dataset_dir = dataset_path.parent
-    file_id_mapping = load_file_id_mapping(str(dataset_dir))
-    allowed_entities = extract_entity_names_from_mapping(file_id_mapping)
+    allowed_entities = load_allowed_entities(str(dataset_dir))
 
     # Initialize RAG adapter
     logger.info("Initializing RAG adapter for user: %s", args.user_id)
@@ -263,7 +404,7 @@ async def main():
             logger.info("Opik not configured, logging disabled")
 
     # Run evaluation
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
     results: List[EvalResult] = []
 
     # Check if we should use Opik experiment evaluation
@@ -275,31 +416,21 @@ async def main():
 
     summary = None  # Initialize summary
 
+    # Opik item dicts, shared by the experiment and trace-logging paths
+    sample_dicts = (
+        [s.to_opik_dict() for s in samples]
+        if opik_adapter and opik_adapter.enabled else []
+    )
+
     if use_opik_experiment:
         # Use Opik's evaluate() API for proper Experiments
         logger.info("Running evaluation using Opik Experiment API...")
-        sample_dicts = [
-            {
-                "id": s.id,
-                "query": s.query,
-                "intent": s.intent,
-                "expected_file_ids": s.expected_file_ids,
-                "must_cite": s.must_cite,
-                "required_citations_count": s.required_citations_count,
-                "answer_style": s.answer_style,
-                "max_entities": s.max_entities,
-                "is_out_of_scope": s.is_out_of_scope,
-                "must_refuse": s.must_refuse,
-                "no_external_knowledge": s.no_external_knowledge,
-                "allowed_uncertainty": s.allowed_uncertainty,
-            }
-            for s in samples
-        ]
 
         experiment_name = await opik_adapter.run_evaluation(
             rag_adapter=rag_adapter,
             samples=sample_dicts,
             experiment_name=f"eval_{timestamp}",
+            task_threads=args.eval_concurrency,
         )
 
         if experiment_name:
@@ -312,25 +443,18 @@ async def main():
     if not use_opik_experiment:
         # Manual evaluation loop (fallback or when Opik is disabled)
         logger.info("Starting manual evaluation of %d samples...", len(samples))
-        for idx, sample in enumerate(samples, 1):
-            logger.info("[%d/%d] Running: %s", idx, len(samples), sample.id)
-
-            result = run_single_query(rag_adapter, sample)
-
-            # Compute metrics
-            result = compute_metrics(sample, result, allowed_entities)
-            results.append(result)
-
-            # Progress update
-            if result.error:
-                logger.warning("  Error: %s", result.error)
-            else:
-                logger.info(
-                    "  Recall@5=%.2f Recall@10=%.2f Latency=%.0fms",
-                    result.recall_at_5,
-                    result.recall_at_10,
-                    result.latency_ms,
-                )
+        if args.sequential:
+            for idx, sample in enumerate(samples, 1):
+                result = run_single_query(rag_adapter, sample)
+                results.append(result)
+                _log_result(idx, len(samples), result)
+        else:
+            results = await run_queries_concurrently(
+                rag_adapter, samples, args.concurrency)
+
+        # Compute metrics once all queries are done, so CPU work doesn't
+        # serialize the I/O
+        results = compute_metrics_batch(samples, results, allowed_entities)
 
         # Compute summary
         summary = compute_summary(results, samples)
@@ -345,23 +469,6 @@ async def main():
         # Log to Opik using traces (if experiment mode wasn't used)
         if opik_adapter and opik_adapter.enabled:
             result_dicts = [r.to_dict() for r in results]
-            sample_dicts = [
-                {
-                    "id": s.id,
-                    "query": s.query,
-                    "intent": s.intent,
-                    "expected_file_ids": s.expected_file_ids,
-                    "must_cite": s.must_cite,
-                    "required_citations_count": s.required_citations_count,
-                    "answer_style": s.answer_style,
-                    "max_entities": s.max_entities,
-                    "is_out_of_scope": s.is_out_of_scope,
-                    "must_refuse": s.must_refuse,
-                    "no_external_knowledge": s.no_external_knowledge,
-                    "allowed_uncertainty": s.allowed_uncertainty,
-                }
-                for s in samples
-            ]
             opik_adapter.log_evaluation_run(
                 result_dicts, summary.to_dict(), sample_dicts
             )
@@ -375,5 +482,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    import asyncio
     sys.exit(asyncio.run(main()))
@@ -2,11 +2,12 @@
 Evaluation data schema definitions.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class EvalSample:
     """Input sample from the evaluation dataset."""
 
@@ -40,8 +41,11 @@ class EvalSample:
             allowed_uncertainty=data.get("allowed_uncertainty", False),
         )
 
+    def to_opik_dict(self) -> dict:
+        return dict(zip(_SAMPLE_FIELDS, _SAMPLE_GET(self)))
 
-@dataclass
+
+@dataclass(slots=True)
 class EvalResult:
     """Output result for a single evaluation sample."""
 
@@ -70,32 +74,10 @@ class EvalResult:
     max_entities_ok: Optional[bool] = None
 
     def to_dict(self) -> dict:
-        return {
-            "sample_id": self.sample_id,
-            "query": self.query,
-            "intent": self.intent,
-            "expected_file_ids": self.expected_file_ids,
-            "answer_text": self.answer_text,
-            "retrieved_node_ids": self.retrieved_node_ids,
-            "retrieved_file_ids": self.retrieved_file_ids,
-            "citation_file_ids": self.citation_file_ids,
-            "latency_ms": self.latency_ms,
-            "error": self.error,
-            "recall_at_5": self.recall_at_5,
-            "recall_at_10": self.recall_at_10,
-            "recall_all_at_5": self.recall_all_at_5,
-            "recall_all_at_10": self.recall_all_at_10,
-            "has_sources_section": self.has_sources_section,
-            "citation_count": self.citation_count,
-            "citation_count_ok": self.citation_count_ok,
-            "cites_expected": self.cites_expected,
-            "refusal_detected": self.refusal_detected,
-            "refusal_correct": self.refusal_correct,
-            "max_entities_ok": self.max_entities_ok,
-        }
-
-
-@dataclass
+        return dict(zip(_RESULT_FIELDS, _RESULT_GET(self)))
+
+
+@dataclass(slots=True)
 class EvalSummary:
     """Summary statistics for an evaluation run."""
 
@@ -113,17 +95,14 @@ class EvalSummary:
     refusal_samples_count: int = 0
 
     def to_dict(self) -> dict:
-        return {
-            "total_samples": self.total_samples,
-            "successful_samples": self.successful_samples,
-            "failed_samples": self.failed_samples,
-            "mean_latency_ms": self.mean_latency_ms,
-            "mean_recall_at_5": self.mean_recall_at_5,
-            "mean_recall_at_10": self.mean_recall_at_10,
-            "mean_recall_all_at_5": self.mean_recall_all_at_5,
-            "mean_recall_all_at_10": self.mean_recall_all_at_10,
-            "cite_compliance_rate": self.cite_compliance_rate,
-            "refusal_correctness_rate": self.refusal_correctness_rate,
-            "cite_samples_count": self.cite_samples_count,
-            "refusal_samples_count": self.refusal_samples_count,
-        }
+        return dict(zip(_SUMMARY_FIELDS, _SUMMARY_GET(self)))
+
+
+# Field names in declaration order and matching getters, so the to_dict
+# methods build their dicts without per-field attribute code.
+_SAMPLE_FIELDS = tuple(f.name for f in fields(EvalSample))
+_SAMPLE_GET = attrgetter(*_SAMPLE_FIELDS)
+_RESULT_FIELDS = tuple(f.name for f in fields(EvalResult))
+_RESULT_GET = attrgetter(*_RESULT_FIELDS)
+_SUMMARY_FIELDS = tuple(f.name for f in fields(EvalSummary))
+_SUMMARY_GET = attrgetter(*_SUMMARY_FIELDS)
@@ -11,10 +11,11 @@ Usage:
 """
 
 from backend.utils.opik_prompts import get_or_register_prompt
-from backend.utils.prompt_loader import PromptLoader
+from backend.utils.prompt_loader import PROMPT_LOADER
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Add repo root to path to allow importing backend modules
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -26,6 +27,9 @@ if REPO_ROOT not in sys.path:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("sync_prompts")
 
+# Concurrent Opik registration requests
+MAX_WORKERS = 8
+
 
 def main():
     """
@@ -36,7 +40,7 @@ def main():
         print("ERROR: OPIK_API_KEY not set in environment or .env file.")
         sys.exit(1)
 
-    loader = PromptLoader()
+    loader = PROMPT_LOADER
     prompt_dir = loader.PROMPT_DIR
 
     print(f"Syncing prompts from {prompt_dir} to Opik...")
@@ -45,26 +49,30 @@ def main():
     # List of files to ignore that might live in the prompts/ directory
     IGNORE_FILES = {"README.md", "versions.json"}
 
+    # Loading is local and fast; keep it serial and register concurrently
+    specs = []
     for filename in sorted(os.listdir(prompt_dir)):
         # Only process markdown files that aren't on the ignore list
         if filename.endswith(".md") and filename not in IGNORE_FILES:
             name = filename[:-3]
             try:
                 # Load the full prompt specification (text, version, hash)
-                spec = loader.get(name)
-                print(
-                    f" - Registering {spec.name} (v{spec.version})...", end="", flush=True)
-
-                # Register or retrieve the prompt from Opik Library
-                opik_prompt = get_or_register_prompt(spec)
-                if opik_prompt:
-                    print(" ✅ Done")
-                    synced_count += 1
-                else:
-                    print(" ❌ Failed (check logs)")
+                specs.append(loader.get(name))
             except Exception as e:
                 print(f" ❌ Error loading {name}: {e}")
 
+    # Register or retrieve each prompt from the Opik Library; map() keeps
+    # the report in file order
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        registered = executor.map(get_or_register_prompt, specs)
+        for spec, opik_prompt in zip(specs, registered):
+            if opik_prompt:
+                print(f" - Registering {spec.name} (v{spec.version})... ✅ Done")
+                synced_count += 1
+            else:
+                print(
+                    f" - Registering {spec.name} (v{spec.version})... ❌ Failed (check logs)")
+
     print(
         f"\nSuccessfully synced {synced_count} prompts to Opik (ignored {len(IGNORE_FILES)} documentation/metadata files).")
 
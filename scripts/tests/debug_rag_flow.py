@@ -8,20 +8,19 @@ to trigger either casual or knowledge base tools.
 Usage:
     PYTHONPATH=. python scripts/tests/debug_rag_flow.py
 """
-from dotenv import load_dotenv
 import logging
-import sys
 import os
-from backend.services.rag import RAGService
+import sys
 import warnings
 
-# Suppress annoying library-level warnings
+# Suppress annoying library-level warnings. Installed before the backend is
+# imported so pymilvus' import-time warnings are filtered too.
 warnings.filterwarnings("ignore", category=UserWarning, module="pymilvus")
 warnings.filterwarnings("ignore", message="The 'validate_default' attribute")
 
 
 # 1. Add repo root to path so we can import backend
-sys.path.append(os.getcwd())
+sys.path.insert(0, os.getcwd())
 
 
 # Setup minimal logging to see the routing
@@ -29,6 +28,10 @@ logging.basicConfig(level=logging.INFO)
 
 
 def debug_query():
+    # Heavy imports (llama-index, pymilvus) are deferred until a query runs
+    from dotenv import load_dotenv
+    from backend.services.rag import RAGService
+
     load_dotenv()
 
     # 2. Mock User Context
@@ -8,39 +8,50 @@ to ensure core functionality (chat, retrieval, etc.) is working as expected.
 
 Usage:
     python3 scripts/tests/rag_api_smoke_tests.py
+    RAG_TEST_BATCH=1 python3 scripts/tests/rag_api_smoke_tests.py  # use /api/chat/batch
 """
+import asyncio
 import os
 import sys
-import time
+from dataclasses import dataclass
 
 from rag_test_utils import (
+    arequest_json,
     get_auth_token,
     get_base_url,
     load_env,
-    request_json,
+    make_async_client,
+    request_batch,
     validate_response,
 )
 
 
 ENV_PATH = os.path.join(os.path.dirname(__file__), "..", "..", ".env")
+# Max queries in flight against the API
+CONCURRENCY = 4
+# Messages per /api/chat/batch request (the server's MAX_BATCH_MESSAGES)
+BATCH_SIZE = 20
 
 
-TEST_CASES = [
-    {
-        "name": "case_01_single",
-        "queries": ["hi"],
-    },
-    {
-        "name": "case_02_double",
-        "queries": [
+@dataclass(frozen=True, slots=True)
+class SmokeCase:
+    name: str
+    queries: tuple
+
+
+TEST_CASES = (
+    SmokeCase("case_01_single", ("hi",)),
+    SmokeCase(
+        "case_02_double",
+        (
             "list 5 documents",
             "list 3 stocks",
-        ],
-    },
-]
+        ),
+    ),
+)
 
 
-def main():
+async def main():
     load_env(ENV_PATH)
     base_url = get_base_url()
     token = get_auth_token(base_url)
@@ -49,24 +60,65 @@ def main():
         "Content-Type": "application/json",
     }
 
+    # Set RAG_TEST_BATCH=1 to send the queries through /api/chat/batch
+    use_batch = os.environ.get("RAG_TEST_BATCH") == "1"
+
     print(f"Using API base: {base_url}")
-    total_queries = sum(len(case["queries"]) for case in TEST_CASES)
-    print(f"Running {len(TEST_CASES)} cases ({total_queries} queries).")
+    total_queries = sum(len(case.queries) for case in TEST_CASES)
+    unique_queries = list(dict.fromkeys(
+        q for case in TEST_CASES for q in case.queries))
+    print(
+        f"Running {len(TEST_CASES)} cases ({total_queries} queries, "
+        f"{len(unique_queries)} unique)."
+    )
+
+    async with make_async_client(CONCURRENCY) as client:
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def send(query):
+            async with semaphore:
+                return await arequest_json(
+                    client,
+                    "POST",
+                    f"{base_url}/api/chat/message",
+                    payload={"message": query},
+                    headers=headers,
+                )
+
+        async def send_batch(queries):
+            async with semaphore:
+                return await asyncio.to_thread(
+                    request_batch, base_url, headers, queries)
+
+        # Each distinct query is sent once and its response shared by every
+        # case that asks it; gather() keeps results in query order
+        if use_batch:
+            chunks = [
+                unique_queries[i:i + BATCH_SIZE]
+                for i in range(0, len(unique_queries), BATCH_SIZE)
+            ]
+            batches = await asyncio.gather(*(send_batch(c) for c in chunks))
+            responses = [r for batch in batches for r in batch]
+        else:
+            responses = await asyncio.gather(
+                *(send(q) for q in unique_queries))
+
+    by_query = dict(zip(unique_queries, responses))
+    case_responses = [
+        [by_query.get(q, (0, {"error": "no response"})) for q in case.queries]
+        for case in TEST_CASES
+    ]
 
     failures = []
     query_index = 0
-    for case in TEST_CASES:
-        case_name = case["name"]
-        queries = case["queries"]
+    for case, responses in zip(TEST_CASES, case_responses):
+        case_name = case.name
+        queries = case.queries
         print(f"\n{case_name} ({len(queries)} queries)")
-        for q_index, query in enumerate(queries, start=1):
+        for q_index, (query, (status, payload)) in enumerate(
+            zip(queries, responses), start=1
+        ):
             query_index += 1
-            status, payload = request_json(
-                "POST",
-                f"{base_url}/api/chat/message",
-                payload={"message": query},
-                headers=headers,
-            )
             ok, reason = validate_response(query, status, payload)
             status_label = "OK" if ok else "FAIL"
             print(f"[{query_index}/{total_queries}] {status_label}: {query}")
@@ -81,7 +133,6 @@ def main():
                         "payload": payload,
                     }
                 )
-            time.sleep(0.5)
 
     if failures:
         print("\nFailures:")
@@ -96,4 +147,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -5,47 +5,209 @@ This module provides shared helper functions for the RAG testing suite,
 including authentication token retrieval, API request handling, response
 validation, and environment loading.
 """
+import http.client
 import json
+import mmap
 import os
 import re
-import urllib.error
-import urllib.request
+import threading
+import time
+import urllib.parse
+from functools import lru_cache
+
+# KEY=VALUE lines; blank lines, comments and lines without "=" don't match
+ENV_LINE_RE = re.compile(rb"^[^\S\n]*([^\s#=][^=\n]*)=([^\n]*)", re.M)
+LIST_VERB_RE = re.compile(
+    r"\b(list|show|provide|give|enumerate|top|bullet)\b", re.I)
+NUM_RE = re.compile(r"\b(\d{1,2})\b")
+# A "- ", "* ", "1. " or "1) " bullet at the start of a line. Whitespace is
+# horizontal only so a match never spans lines.
+BULLET_LINE_RE = re.compile(r"^[^\S\r\n]*(?:[-*]|\d+[\).])[^\S\r\n]+", re.M)
+ERROR_RESPONSE_RE = re.compile(r"error processing request|empty response", re.I)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _loads(body):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
 
 
 def load_env(path):
     if not os.path.exists(path):
         return
-    with open(path, "r") as handle:
-        for raw_line in handle:
-            line = raw_line.strip()
-            if not line or line.startswith("#") or "=" not in line:
-                continue
-            key, value = line.split("=", 1)
-            key = key.strip()
-            value = value.strip().strip('"').strip("'")
-            if key and key not in os.environ:
-                os.environ[key] = value
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for match in ENV_LINE_RE.finditer(data):
+                key = match.group(1).decode("utf-8").strip()
+                value = match.group(2).decode("utf-8").strip()
+                value = value.strip('"').strip("'")
+                if key:
+                    os.environ.setdefault(key, value)
+
+
+# Methods that may be resent if the response is lost after sending
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Keep-alive connections, one per (scheme, host) per thread
+_local = threading.local()
+
+
+def _get_connection(scheme, netloc, timeout):
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get((scheme, netloc))
+    if conn is None:
+        conn_cls = (
+            http.client.HTTPSConnection if scheme == "https"
+            else http.client.HTTPConnection
+        )
+        conn = connections[(scheme, netloc)] = conn_cls(netloc, timeout=timeout)
+    elif conn.timeout != timeout:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def _drop_connection(scheme, netloc):
+    conn = _local.connections.pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
 
 
 def request_json(method, url, payload=None, headers=None, timeout=120):
     data = None
     if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url, data=data, headers=headers or {}, method=method)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body = resp.read().decode("utf-8")
-            return resp.status, json.loads(body)
-    except urllib.error.HTTPError as err:
-        body = err.read().decode("utf-8")
+        data = _dumps(payload)
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+
+    for attempt in range(2):
+        conn = _get_connection(parts.scheme, parts.netloc, timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=data, headers=headers or {})
+        except (ConnectionResetError, BrokenPipeError) as err:
+            # The server closed an idle keep-alive socket before it read
+            # anything, so resending is safe even for POST; retry once
+            _drop_connection(parts.scheme, parts.netloc)
+            if reused and not attempt:
+                continue
+            return 0, {"error": str(err)}
+        except (OSError, http.client.HTTPException) as err:
+            _drop_connection(parts.scheme, parts.netloc)
+            return 0, {"error": str(err)}
+
+        try:
+            resp = conn.getresponse()
+            body = resp.read()
+            break
+        except (ConnectionResetError, BrokenPipeError) as err:
+            # The request went out, so the server may have acted on it; only
+            # idempotent methods are resent (RemoteDisconnected lands here)
+            _drop_connection(parts.scheme, parts.netloc)
+            if reused and not attempt and method in IDEMPOTENT_METHODS:
+                continue
+            return 0, {"error": str(err)}
+        except (OSError, http.client.HTTPException) as err:
+            _drop_connection(parts.scheme, parts.netloc)
+            return 0, {"error": str(err)}
+
+    return _parse_response(resp.status, body)
+
+
+def _parse_response(status, body):
+    if status >= 400:
         try:
-            payload = json.loads(body)
+            return status, _loads(body)
         except json.JSONDecodeError:
-            payload = {"error": body}
-        return err.code, payload
-    except urllib.error.URLError as err:
+            return status, {"error": body.decode("utf-8")}
+    return status, _loads(body)
+
+
+def make_async_client(max_connections=32):
+    """Pooled httpx client for arequest_json; use as an async context manager."""
+    import httpx
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+    )
+
+
+async def arequest_json(client, method, url, payload=None, headers=None, timeout=120):
+    """Async counterpart of request_json over a shared make_async_client()."""
+    import httpx
+
+    data = None
+    if payload is not None:
+        data = _dumps(payload)
+    try:
+        resp = await client.request(
+            method, url, content=data, headers=headers or {}, timeout=timeout)
+    except httpx.HTTPError as err:
         return 0, {"error": str(err)}
+    return _parse_response(resp.status_code, resp.content)
+
+
+def request_batch(base_url, headers, messages, timeout=600):
+    """
+    Send several chat messages in one /api/chat/batch call.
+    Returns one (status, payload) pair per message, or the request's own
+    error status repeated for each message if the batch as a whole failed.
+    """
+    status, payload = request_json(
+        "POST",
+        f"{base_url}/api/chat/batch",
+        payload={"messages": messages},
+        headers=headers,
+        timeout=timeout,
+    )
+    if status != 200:
+        return [(status, payload)] * len(messages)
+    results = []
+    for item in payload.get("responses", []):
+        item = dict(item)
+        results.append((item.pop("status", 0), item))
+    return results
+
+
+class Backoff:
+    """
+    Throttle only when the server pushes back: after a 429 or 5xx response
+    sleep, doubling the delay up to a cap; any other status resets it.
+    """
+
+    def __init__(self, initial=0.1, maximum=2.0, factor=2.0):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.delay = initial
+
+    def after(self, status):
+        if status == 429 or 500 <= status < 600:
+            time.sleep(self.delay)
+            self.delay = min(self.delay * self.factor, self.maximum)
+        else:
+            self.delay = self.initial
 
 
 def get_base_url():
@@ -56,6 +218,7 @@ def get_base_url():
     return f"http://localhost:{port}"
 
 
+@lru_cache(maxsize=1)
 def get_auth_token(base_url):
     token = (
         os.environ.get("FIREBASE_ID_TOKEN")
@@ -70,22 +233,16 @@ def get_auth_token(base_url):
 
 
 def expected_count_from_query(query):
-    if not re.search(r"\b(list|show|provide|give|enumerate|top|bullet)\b", query, re.I):
+    if not LIST_VERB_RE.search(query):
         return None
-    match = re.search(r"\b(\d{1,2})\b", query)
+    match = NUM_RE.search(query)
     if not match:
         return None
     return int(match.group(1))
 
 
 def bullet_count_from_response(text):
-    count = 0
-    for line in text.splitlines():
-        if re.match(r"^\s*[-*]\s+", line):
-            count += 1
-        elif re.match(r"^\s*\d+[\).]\s+", line):
-            count += 1
-    return count
+    return sum(1 for _ in BULLET_LINE_RE.finditer(text))
 
 
 def validate_response(query, status, payload):
@@ -94,8 +251,7 @@ def validate_response(query, status, payload):
     response_text = payload.get("response") or ""
     if not response_text.strip():
         return False, "Empty response body."
-    lowered = response_text.lower()
-    if "error processing request" in lowered or "empty response" in lowered:
+    if ERROR_RESPONSE_RE.search(response_text):
         return False, "Response indicates an error or empty result."
     expected = expected_count_from_query(query)
     if expected:
@@ -14,6 +14,7 @@ from backend.services.rag.ocr_utils import get_ocr_config
 from backend.services.rag import ocr_readers
 from PIL import Image, ImageDraw, ImageFont
 import fitz
+import hashlib
 import os
 import sys
 import tempfile
@@ -23,6 +24,38 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 
 
+# Generated fixtures are reused across runs; bump the version to rebuild them
+FIXTURE_CACHE_DIR = os.environ.get(
+    "RAG_OCR_FIXTURE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "rag-ocr-tests"),
+)
+FIXTURE_VERSION = 1
+
+
+def cached_fixture(kind, ext, build, *args):
+    """
+    Return the path of a fixture built by build(path, *args), generating it
+    only if no file for the same kind and arguments is cached yet.
+    """
+    key = hashlib.blake2b(
+        repr((FIXTURE_VERSION, kind, args)).encode("utf-8"), digest_size=16
+    ).hexdigest()
+    path = os.path.join(FIXTURE_CACHE_DIR, f"{kind}_{key}{ext}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(FIXTURE_CACHE_DIR, exist_ok=True)
+    # Build under a temporary name so a partial file is never reused
+    fd, tmp_path = tempfile.mkstemp(suffix=ext, dir=FIXTURE_CACHE_DIR)
+    os.close(fd)
+    try:
+        build(tmp_path, *args)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
 def create_text_image(path, text, size=(1200, 400)):
     image = Image.new("RGB", size, color="white")
     draw = ImageDraw.Draw(image)
@@ -68,70 +101,67 @@ def assert_has_metadata(doc, expected_source, expected_page):
 
 
 def test_scanned_pdf(config):
-    with tempfile.TemporaryDirectory() as tmpdir:
-        pdf_path = os.path.join(tmpdir, "scanned.pdf")
-        create_scanned_pdf(pdf_path, "SCANNED PDF OCR SAMPLE")
-        metadata = {
-            "file id": "scanned_pdf",
-            "file name": "scanned.pdf",
-            "mime type": "application/pdf",
-            "modified at": "2024-01-01T00:00:00Z",
-        }
-        docs = ocr_readers.load_pdf_documents(
-            pdf_path, metadata, config=config)
-        assert docs, "Expected OCR documents for scanned PDF"
-        assert any(doc.metadata.get("source") == "ocr" for doc in docs)
-        assert_has_metadata(
-            docs[0],
-            docs[0].metadata.get("source"),
-            docs[0].metadata.get("page_number"),
-        )
+    pdf_path = cached_fixture(
+        "scanned", ".pdf", create_scanned_pdf, "SCANNED PDF OCR SAMPLE")
+    metadata = {
+        "file id": "scanned_pdf",
+        "file name": "scanned.pdf",
+        "mime type": "application/pdf",
+        "modified at": "2024-01-01T00:00:00Z",
+    }
+    docs = ocr_readers.load_pdf_documents(
+        pdf_path, metadata, config=config)
+    assert docs, "Expected OCR documents for scanned PDF"
+    assert any(doc.metadata.get("source") == "ocr" for doc in docs)
+    assert_has_metadata(
+        docs[0],
+        docs[0].metadata.get("source"),
+        docs[0].metadata.get("page_number"),
+    )
 
 
 def test_hybrid_pdf(config):
-    with tempfile.TemporaryDirectory() as tmpdir:
-        pdf_path = os.path.join(tmpdir, "hybrid.pdf")
-        digital_text = (
-            "This page contains digital text that should exceed the OCR threshold."
-        )
-        create_hybrid_pdf(pdf_path, digital_text, "IMAGE OCR PAGE TWO")
-        metadata = {
-            "file id": "hybrid_pdf",
-            "file name": "hybrid.pdf",
-            "mime type": "application/pdf",
-            "modified at": "2024-01-02T00:00:00Z",
-        }
-        docs = ocr_readers.load_pdf_documents(
-            pdf_path, metadata, config=config)
-        sources = {
-            (doc.metadata.get("page_number"), doc.metadata.get("source"))
-            for doc in docs
-        }
-        assert (1, "digital_text") in sources, "Expected digital text on page 1"
-        assert (2, "ocr") in sources, "Expected OCR on page 2"
-        assert any(
-            digital_text.strip() in doc.text
-            for doc in docs
-            if doc.metadata.get("source") == "digital_text"
-        )
+    digital_text = (
+        "This page contains digital text that should exceed the OCR threshold."
+    )
+    pdf_path = cached_fixture(
+        "hybrid", ".pdf", create_hybrid_pdf, digital_text, "IMAGE OCR PAGE TWO")
+    metadata = {
+        "file id": "hybrid_pdf",
+        "file name": "hybrid.pdf",
+        "mime type": "application/pdf",
+        "modified at": "2024-01-02T00:00:00Z",
+    }
+    docs = ocr_readers.load_pdf_documents(
+        pdf_path, metadata, config=config)
+    sources = {
+        (doc.metadata.get("page_number"), doc.metadata.get("source"))
+        for doc in docs
+    }
+    assert (1, "digital_text") in sources, "Expected digital text on page 1"
+    assert (2, "ocr") in sources, "Expected OCR on page 2"
+    assert any(
+        digital_text.strip() in doc.text
+        for doc in docs
+        if doc.metadata.get("source") == "digital_text"
+    )
 
 
 def test_image_ocr(config):
-    with tempfile.TemporaryDirectory() as tmpdir:
-        img_path = os.path.join(tmpdir, "sample.png")
-        create_text_image(img_path, "IMAGE OCR SAMPLE")
-        metadata = {
-            "file id": "image_file",
-            "file name": "sample.png",
-            "mime type": "image/png",
-            "modified at": "2024-01-03T00:00:00Z",
-        }
-        docs = ocr_readers.load_documents_for_file(
-            img_path, metadata, config=config)
-        assert docs, "Expected OCR document for image"
-        doc = docs[0]
-        assert_has_metadata(doc, "ocr", 1)
-        assert doc.text.strip()
+    img_path = cached_fixture(
+        "image", ".png", create_text_image, "IMAGE OCR SAMPLE")
+    metadata = {
+        "file id": "image_file",
+        "file name": "sample.png",
+        "mime type": "image/png",
+        "modified at": "2024-01-03T00:00:00Z",
+    }
+    docs = ocr_readers.load_documents_for_file(
+        img_path, metadata, config=config)
+    assert docs, "Expected OCR document for image"
+    doc = docs[0]
+    assert_has_metadata(doc, "ocr", 1)
+    assert doc.text.strip()
 
 
 def main():
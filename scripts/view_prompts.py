@@ -7,30 +7,175 @@ and whether they have been synchronized with the Opik Prompt Library in the curr
 environment context.
 
 Usage:
-    PYTHONPATH=. python scripts/view_prompts.py
+    python scripts/view_prompts.py
+    python scripts/view_prompts.py --json  # machine-readable, no rich rendering
 """
 
-from backend.utils.prompt_loader import PromptLoader
-from backend.utils.opik_prompts import _opik_prompt_cache
+import argparse
+import json
 import os
 import sys
-import json
-from rich.console import Console
-from rich.table import Table
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-# Add repo root to path to allow importing backend modules
+# Add repo root to path to allow importing backend modules; main() imports
+# them lazily, so this runs first and PYTHONPATH=. is not needed
 REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if REPO_ROOT not in sys.path:
     sys.path.append(REPO_ROOT)
 
+# Threads used to load prompt specs in parallel
+MAX_WORKERS = 8
+
+
+def _load_spec(loader, name):
+    """Load one prompt spec, returning (name, spec, error) so one unreadable
+    file still renders as an error row. Other exceptions are bugs and
+    propagate."""
+    try:
+        return name, loader.get(name), None
+    except (OSError, UnicodeDecodeError) as e:
+        return name, None, e
+
+
+def _scan_prompt_dir(prompt_scan, examples_dir, prompt_dir):
+    """
+    Collect prompt names from an open scandir of prompt_dir.
+    Returns (sorted names, has_examples); has_examples is None when the
+    examples folder is not a direct child of prompt_dir.
+    """
+    # The examples folder normally lives inside prompt_dir, in which case
+    # this same scan tells us whether it exists
+    examples_name = (
+        os.path.basename(examples_dir)
+        if os.path.dirname(examples_dir) == prompt_dir else None
+    )
+    has_examples = None
+    names = []
+    # scandir's entries carry their file type, so filtering needs no extra
+    # stat calls
+    with prompt_scan as it:
+        for entry in it:
+            filename = entry.name
+            if filename == examples_name:
+                has_examples = entry.is_dir()
+                continue
+            # Exclude documentation like README.md from the prompt library view
+            if filename[-3:] != ".md" or filename == "README.md":
+                continue
+            if entry.is_file():
+                names.append(filename[:-3])
+    names.sort()
+    return names, has_examples
+
+
+def _list_examples(examples_dir):
+    with os.scandir(examples_dir) as it:
+        return sorted(
+            entry.name for entry in it
+            if entry.name.endswith(".json") and entry.is_file()
+        )
+
 
 def main():
     """
     Main entry point for the prompt library inspector.
     Scans the prompt directory and displays a status table.
     """
-    console = Console()
-    loader = PromptLoader()
+    parser = argparse.ArgumentParser(
+        description="Show the status of the local prompt library.")
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print prompt status as JSON instead of a rich table",
+    )
+    args = parser.parse_args()
+
+    # Backend modules are imported here rather than at module level so the
+    # repo-root sys.path entry above is in place first
+    from backend.utils.prompt_loader import PROMPT_LOADER
+
+    loader = PROMPT_LOADER
+
+    if args.json:
+        console = None
+    else:
+        # rich is only needed for the table view
+        from rich.console import Console
+        from rich.live import Live
+        from rich.table import Table
+
+        console = Console()
+
+    # Locate the central prompt directory
+    prompt_dir = loader.PROMPT_DIR
+    # Opening the scan validates the path, so no separate exists/stat call
+    try:
+        prompt_scan = os.scandir(prompt_dir)
+    except FileNotFoundError:
+        error = f"Prompt directory not found: {prompt_dir}"
+    except NotADirectoryError:
+        error = f"Prompt path is not a directory: {prompt_dir}"
+    else:
+        error = None
+    if error:
+        if console is None:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+        console.print(f"[red]{error}[/]")
+        return
+
+    examples_dir = loader.EXAMPLES_DIR
+    names, has_examples = _scan_prompt_dir(prompt_scan, examples_dir, prompt_dir)
+    if has_examples is None:
+        has_examples = os.path.isdir(examples_dir)
+
+    try:
+        from backend.utils.opik_prompts import _opik_prompt_cache
+    except ImportError:
+        # Without the Opik helpers nothing can be synced; show every row pending
+        _opik_prompt_cache = {}
+
+    # Every spec lives directly in prompt_dir, so resolve its relative form
+    # once rather than calling relpath (and getcwd) per row
+    prompt_dir_rel = os.path.relpath(prompt_dir)
+
+    # Opik cache keys are "name:hash"; split them once instead of formatting
+    # a key per row
+    synced = frozenset(
+        tuple(key.rsplit(":", 1)) for key in list(_opik_prompt_cache)
+    )
+
+    if args.json:
+        prompts = []
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(partial(_load_spec, loader), names)
+            for name, spec, error in results:
+                if error is not None:
+                    prompts.append({
+                        "name": name,
+                        "error": f"{type(error).__name__}: {error}",
+                    })
+                    continue
+                prompts.append({
+                    "name": spec.name,
+                    "version": spec.version,
+                    "hash": spec.hash,
+                    "path": os.path.join(
+                        prompt_dir_rel, os.path.basename(spec.path)),
+                    "synced": (spec.name, spec.hash) in synced,
+                })
+        json.dump(
+            {
+                "prompts": prompts,
+                "examples": _list_examples(examples_dir) if has_examples else [],
+            },
+            sys.stdout,
+            indent=2,
+            ensure_ascii=False,
+        )
+        sys.stdout.write("\n")
+        return
 
     # Create a nice UI table using 'rich'
     table = Table(title="RAG Prompt Library Status")
@@ -40,44 +185,36 @@ def main():
     table.add_column("Path", style="dim")
     table.add_column("Opik Sync", style="yellow")
 
-    # Locate the central prompt directory
-    prompt_dir = loader.PROMPT_DIR
-    if not os.path.exists(prompt_dir):
-        console.print(f"[red]Prompt directory not found: {prompt_dir}[/]")
-        return
-
-    # Iterate through all markdown files in the prompts folder
-    for filename in sorted(os.listdir(prompt_dir)):
-        # Exclude documentation like README.md from the prompt library view
-        if filename.endswith(".md") and filename != "README.md":
-            name = filename[:-3]
-            try:
-                # Retrieve the full specification for the prompt
-                spec = loader.get(name)
-
-                # Check if this specific hash is already in the in-memory Opik cache
-                is_synced = "✅" if f"{spec.name}:{spec.hash}" in _opik_prompt_cache else "⏳"
-
+    # Load specs concurrently (disk-bound); rows are added on this thread in
+    # name order since rich's Table is not thread-safe. Live redraws the
+    # table as rows arrive and leaves the final render on screen.
+    with Live(table, console=console, refresh_per_second=10), \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(partial(_load_spec, loader), names)
+        for name, spec, error in results:
+            if error is not None:
                 table.add_row(
-                    spec.name,
-                    spec.version,
-                    spec.hash[:8],
-                    os.path.relpath(spec.path),
-                    is_synced
-                )
-            except Exception as e:
-                table.add_row(name, "[red]Error[/]", "", str(e), "❌")
+                    name, "[red]Error[/]", "",
+                    f"{type(error).__name__}: {error}", "❌")
+                continue
 
-    console.print(table)
+            # Check if this specific hash is already in the in-memory Opik cache
+            is_synced = "✅" if (spec.name, spec.hash) in synced else "⏳"
+
+            table.add_row(
+                spec.name,
+                spec.version,
+                spec.hash_short,
+                os.path.join(prompt_dir_rel, os.path.basename(spec.path)),
+                is_synced
+            )
 
     # Display information about available few-shot examples
-    examples_dir = loader.EXAMPLES_DIR
-    if os.path.exists(examples_dir):
+    if has_examples:
         console.print(
             f"\n[bold]Few-Shot Examples in {os.path.relpath(examples_dir)}:[/]")
-        for f in sorted(os.listdir(examples_dir)):
-            if f.endswith(".json"):
-                console.print(f" - {f}")
+        for f in _list_examples(examples_dir):
+            console.print(f" - {f}")
 
 
 if __name__ == "__main__":